@@ -21,6 +21,7 @@ from bpy.types import Operator, Panel
 
 # Import functions
 from .plugin import ndpt_functions
+from .plugin import ndpt_utils
 
 # Debug Logging
 #import logging
@@ -85,6 +86,34 @@ class NDPT_OT_JoinGeometryNodes(bpy.types.Operator):
         return {'FINISHED'}
 
 
+# Find duplicate geometry operator
+class NDPT_OT_FindDuplicateGeometry(bpy.types.Operator):
+    """ Selects vertices that coincide with a vertex of another selected object and finds duplicated objects """
+    bl_idname = "ndptobject.findduplicategeometry"
+    bl_label = "Select vertices that coincide with other selected objects and find duplicated objects"
+    bl_options = {"REGISTER", "UNDO"}
+    
+    # Only enable in object mode
+    @classmethod
+    def poll(cls, context):
+        return context.mode == "OBJECT"
+    
+    # Button is pressed
+    def execute(self, context):
+        # Log settings
+        self.report({'INFO'},f"Finding duplicate geometry")
+        #logging.info(f"finding duplicate geometry")
+        #logging.info(f"settings:")
+        #logging.info(f"merge distance: {context.scene.ndpt.NDPT_OT_SelectMergeable_MergeDistance}")
+        #logging.info(f"select duplicates: {context.scene.ndpt.NDPT_OT_FindDuplicateGeometry_SelectDuplicates}")
+        
+        # Run the function
+        result = ndpt_functions.select_duplicate_geometry(mergedistance = context.scene.ndpt.NDPT_OT_SelectMergeable_MergeDistance, selectduplicates = context.scene.ndpt.NDPT_OT_FindDuplicateGeometry_SelectDuplicates)
+        report_results(self, result)
+        
+        return {'FINISHED'}
+
+
 # Synchronize data block names operator
 class NDPT_OT_SyncDataNames(bpy.types.Operator):
     """ Rename object data blocks to be the same as the object name """
@@ -110,6 +139,33 @@ class NDPT_OT_SyncDataNames(bpy.types.Operator):
         return {'FINISHED'}
 
 
+# Purge unreachable data operator
+class NDPT_OT_PurgeUnreachableData(bpy.types.Operator):
+    """ Finds node groups, materials, meshes and images that no scene uses, even through other unused data """
+    bl_idname = "ndptdata.purgeunreachabledata"
+    bl_label = "Find node groups, materials, meshes and images that no scene uses, and optionally delete them"
+    bl_options = {"REGISTER", "UNDO"}
+    
+    # Enable button condition
+    @classmethod
+    def poll(cls, context):
+        return context.mode == "OBJECT"
+    
+    # Button is pressed
+    def execute(self, context):
+        # Log settings
+        self.report({'INFO'},f"Finding unused data")
+        #logging.info(f"finding unused data")
+        #logging.info(f"settings:")
+        #logging.info(f"delete: {context.scene.ndpt.NDPT_OT_PurgeUnreachableData_Delete}")
+        
+        # Run the function
+        result = ndpt_functions.purge_unreachable_data(delete = context.scene.ndpt.NDPT_OT_PurgeUnreachableData_Delete)
+        report_results(self, result)
+
+        return {'FINISHED'}
+
+
 # Convert particles to curves
 class NDPT_OT_ConvertParticlesToCurves(bpy.types.Operator):
     """ Convert active particle system into a curves object """
@@ -223,6 +279,35 @@ class NDPT_OT_ConvertScaleToLocation(bpy.types.Operator):
         return {'FINISHED'}
 
 
+# Mirror vertex groups operator
+class NDPT_OT_MirrorVertexGroups(bpy.types.Operator):
+    """ Mirrors all vertex group weights across the symmetry axis, flipping left and right group names """
+    bl_idname = "ndptarmature.mirrorvertexgroups"
+    bl_label = "Mirror all vertex group weights across the symmetry axis of the selected meshes"
+    bl_options = {"REGISTER", "UNDO"}
+    
+    # Only enable in object mode or weight paint mode
+    @classmethod
+    def poll(cls, context):
+        return context.mode == "OBJECT" or context.mode == "PAINT_WEIGHT"
+    
+    # Button is pressed
+    def execute(self, context):
+        # Log settings
+        self.report({'INFO'},f"Mirroring vertex groups")
+        #logging.info(f"mirroring vertex groups")
+        #logging.info(f"settings:")
+        #logging.info(f"symmetry axis: {context.scene.ndpt.NDPT_OT_SelectHalf_SymmetryAxis}")
+        #logging.info(f"symmetry mode: {context.scene.ndpt.NDPT_OT_SelectAsymmetrical_SymmetryMode}")
+        #logging.info(f"flip names: {context.scene.ndpt.NDPT_OT_MirrorVertexGroups_FlipNames}")
+        
+        # Run the function
+        result = ndpt_functions.mirror_vertex_groups(symmetryaxis = context.scene.ndpt.NDPT_OT_SelectHalf_SymmetryAxis, symmetrymode = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_SymmetryMode, centertolerance = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_CenterTolerance, flipnames = context.scene.ndpt.NDPT_OT_MirrorVertexGroups_FlipNames)
+        report_results(self, result)
+
+        return {'FINISHED'}
+
+
 # Select half operator
 class NDPT_OT_SelectHalf(bpy.types.Operator):
     """ Selects all the vertices on one half of the model """
@@ -230,10 +315,10 @@ class NDPT_OT_SelectHalf(bpy.types.Operator):
     bl_label = "Select all the vertices on one half of the model"
     bl_options = {"REGISTER", "UNDO"}
     
-    # Only enable in object mode
+    # Only enable in edit mode or object mode
     @classmethod
     def poll(cls, context):
-        return context.mode == "EDIT_MESH"
+        return context.mode == "EDIT_MESH" or context.mode == "OBJECT"
     
     # Button is pressed
     def execute(self, context):
@@ -258,10 +343,10 @@ class  NDPT_OT_SelectAsymmetrical(bpy.types.Operator):
     bl_label = "Selects vertices that do not have symmetry with the other half of the model"
     bl_options = {"REGISTER", "UNDO"}
     
-    # Only enable in object mode
+    # Only enable in edit mode or object mode
     @classmethod
     def poll(cls, context):
-        return context.mode == "EDIT_MESH"
+        return context.mode == "EDIT_MESH" or context.mode == "OBJECT"
     
     # Button is pressed
     def execute(self, context):
@@ -270,9 +355,42 @@ class  NDPT_OT_SelectAsymmetrical(bpy.types.Operator):
         #logging.info(f"selecting assymetrical vertices")
         #logging.info(f"settings:")
         #logging.info(f"symmetry axis: {context.scene.ndpt.NDPT_OT_SelectHalf_SymmetryAxis}")
+        #logging.info(f"symmetry mode: {context.scene.ndpt.NDPT_OT_SelectAsymmetrical_SymmetryMode}")
+        #logging.info(f"center tolerance: {context.scene.ndpt.NDPT_OT_SelectAsymmetrical_CenterTolerance}")
+        #logging.info(f"evaluated mesh: {context.scene.ndpt.NDPT_OT_SelectAsymmetrical_UseEvaluated}")
+        #logging.info(f"write heatmap: {context.scene.ndpt.NDPT_OT_SelectAsymmetrical_WriteHeatmap}")
+        #logging.info(f"frame largest island: {context.scene.ndpt.NDPT_OT_SelectAsymmetrical_FrameLargestIsland}")
+        
+        # Run the function
+        result = ndpt_functions.select_asymmetrical_vertices(symmetryaxis = context.scene.ndpt.NDPT_OT_SelectHalf_SymmetryAxis, symmetrymode = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_SymmetryMode, centertolerance = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_CenterTolerance, useevaluated = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_UseEvaluated, writeheatmap = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_WriteHeatmap, heatmaprange = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_HeatmapRange, frameisland = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_FrameLargestIsland)
+        report_results(self, result)
+
+        return {'FINISHED'}
+
+
+# Symmetrize asymmetrical operator
+class  NDPT_OT_SymmetrizeAsymmetrical(bpy.types.Operator):
+    """ Snaps near-miss asymmetrical vertices to the exact mirrored position of their counterpart """
+    bl_idname = "ndptedit.symmetrizeasymmetrical"
+    bl_label = "Snaps near-miss asymmetrical vertices to the exact mirrored position of their counterpart"
+    bl_options = {"REGISTER", "UNDO"}
+    
+    # Only enable in edit mode or object mode
+    @classmethod
+    def poll(cls, context):
+        return context.mode == "EDIT_MESH" or context.mode == "OBJECT"
+    
+    # Button is pressed
+    def execute(self, context):
+        # Log settings
+        self.report({'INFO'},f"Symmetrizing asymmetrical vertices")
+        #logging.info(f"symmetrizing asymmetrical vertices")
+        #logging.info(f"settings:")
+        #logging.info(f"symmetry axis: {context.scene.ndpt.NDPT_OT_SelectHalf_SymmetryAxis}")
+        #logging.info(f"snap tolerance: {context.scene.ndpt.NDPT_OT_SymmetrizeAsymmetrical_SnapTolerance}")
         
         # Run the function
-        result = ndpt_functions.select_asymmetrical_vertices(symmetryaxis = context.scene.ndpt.NDPT_OT_SelectHalf_SymmetryAxis)
+        result = ndpt_functions.symmetrize_asymmetrical_vertices(symmetryaxis = context.scene.ndpt.NDPT_OT_SelectHalf_SymmetryAxis, snaptolerance = context.scene.ndpt.NDPT_OT_SymmetrizeAsymmetrical_SnapTolerance)
         report_results(self, result)
 
         return {'FINISHED'}
@@ -285,10 +403,10 @@ class  NDPT_OT_SelectMergeable(bpy.types.Operator):
     bl_label = "Selects vertices that are in the same location as another vertex"
     bl_options = {"REGISTER", "UNDO"}
     
-    # Only enable in object mode
+    # Only enable in edit mode or object mode
     @classmethod
     def poll(cls, context):
-        return context.mode == "EDIT_MESH"
+        return context.mode == "EDIT_MESH" or context.mode == "OBJECT"
     
     # Button is pressed
     def execute(self, context):
@@ -296,8 +414,40 @@ class  NDPT_OT_SelectMergeable(bpy.types.Operator):
         self.report({'INFO'},f"Selecting mergeable vertices")
         #logging.info(f"selecting mergeable vertices")
         
+        #logging.info(f"settings:")
+        #logging.info(f"merge distance: {context.scene.ndpt.NDPT_OT_SelectMergeable_MergeDistance}")
+        #logging.info(f"evaluated mesh: {context.scene.ndpt.NDPT_OT_SelectAsymmetrical_UseEvaluated}")
+        #logging.info(f"frame largest island: {context.scene.ndpt.NDPT_OT_SelectAsymmetrical_FrameLargestIsland}")
+        
+        # Run the function
+        result = ndpt_functions.select_mergeable_vertices(mergedistance = context.scene.ndpt.NDPT_OT_SelectMergeable_MergeDistance, useevaluated = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_UseEvaluated, frameisland = context.scene.ndpt.NDPT_OT_SelectAsymmetrical_FrameLargestIsland)
+        report_results(self, result)
+        
+        return {'FINISHED'}
+
+
+# Select degenerate geometry operator
+class  NDPT_OT_SelectDegenerate(bpy.types.Operator):
+    """ Selects duplicate faces, zero area faces, zero length edges and loose geometry """
+    bl_idname = "ndptedit.selectdegenerate"
+    bl_label = "Selects duplicate faces, zero area faces, zero length edges and loose geometry"
+    bl_options = {"REGISTER", "UNDO"}
+    
+    # Only enable in edit mode or object mode
+    @classmethod
+    def poll(cls, context):
+        return context.mode == "EDIT_MESH" or context.mode == "OBJECT"
+    
+    # Button is pressed
+    def execute(self, context):
+        # Log settings
+        self.report({'INFO'},f"Selecting degenerate geometry")
+        #logging.info(f"selecting degenerate geometry")
+        #logging.info(f"settings:")
+        #logging.info(f"merge distance: {context.scene.ndpt.NDPT_OT_SelectMergeable_MergeDistance}")
+        
         # Run the function
-        result = ndpt_functions.select_mergeable_vertices()
+        result = ndpt_functions.select_degenerate_geometry(mergedistance = context.scene.ndpt.NDPT_OT_SelectMergeable_MergeDistance)
         report_results(self, result)
         
         return {'FINISHED'}
@@ -320,10 +470,11 @@ class NDPT_OT_SelectSimilarNodes(bpy.types.Operator):
         # Log settings
         self.report({'INFO'},f"Selecting similar nodes")
         #logging.info(f"selecting similar nodes")
-
+        #logging.info(f"settings:")
+        #logging.info(f"similar by: {context.scene.ndpt.NDPT_OT_SelectSimilarNodes_SimilarBy}")
         
         # Run the function
-        result = ndpt_functions.nodes_select_similar()
+        result = ndpt_functions.nodes_select_similar(similarby = context.scene.ndpt.NDPT_OT_SelectSimilarNodes_SimilarBy)
         report_results(self, result)
 
         return {'FINISHED'}
@@ -348,14 +499,108 @@ class NDPT_OT_MergeDuplicateNodeGroups(bpy.types.Operator):
         #logging.info(f"merging duplicate node groups")
         #logging.info(f"settings:")
         #logging.info(f"priority mode: {context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_PriorityMode}")
+        #logging.info(f"remove duplicates: {context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_RemoveDuplicates}")
+        #logging.info(f"match mode: {context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_MatchMode}")
         
-        # Run the function
-        result = ndpt_functions.node_group_merge_duplicates(prioritymode = context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_PriorityMode)
+        # Run the function. Apply the planned merge if there is one, without searching for duplicates again
+        plan = context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_Plan
+        if len(plan) > 0:
+            result = ndpt_functions.node_group_merge_apply(plan = [{'action': step.action, 'name': step.name, 'target': step.target, 'new_name': step.new_name, 'users': step.users, 'digest': step.digest} for step in plan], validate = True)
+        else:
+            result = ndpt_functions.node_group_merge_duplicates(prioritymode = context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_PriorityMode, removeduplicates = context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_RemoveDuplicates, matchmode = context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_MatchMode)
+        plan.clear()
         report_results(self, result)
 
         return {'FINISHED'}
 
 
+# Plan merge duplicate node groups operator
+class NDPT_OT_PlanMergeDuplicateNodeGroups(bpy.types.Operator):
+    """ Lists what merging duplicate node groups would do, without changing anything """
+    bl_idname = "ndptnodes.planmergeduplicatenodegroups"
+    bl_label = "Lists what merging duplicate node groups would do, without changing anything"
+    bl_options = {"REGISTER"}
+    
+    # Enable button condition
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    # Button is pressed
+    def execute(self, context):
+        # Start
+        scene = context.scene
+        
+        # Log settings
+        self.report({'INFO'},f"Planning the merge of duplicate node groups")
+        #logging.info(f"planning the merge of duplicate node groups")
+        #logging.info(f"settings:")
+        #logging.info(f"priority mode: {context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_PriorityMode}")
+        #logging.info(f"remove duplicates: {context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_RemoveDuplicates}")
+        #logging.info(f"match mode: {context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_MatchMode}")
+        
+        # Clear previous plan
+        scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_Plan.clear()
+        
+        # Run the function
+        plan = ndpt_functions.node_group_merge_plan(prioritymode = context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_PriorityMode, removeduplicates = context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_RemoveDuplicates, matchmode = context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_MatchMode)
+        
+        for step in plan:
+            item = scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_Plan.add()
+            item.action = step['action']
+            item.name = step['name']
+            item.target = step['target']
+            item.new_name = step['new_name']
+            item.users = step['users']
+            item.digest = step['digest']
+        
+        replaced = sum(1 for step in plan if step['action'] == "Replace")
+        self.report({'INFO'}, f"{replaced} duplicates would be replaced, {len(plan) - replaced} node groups kept or renamed.")
+
+        return {'FINISHED'}
+
+
+# Profile node trees operator
+class NDPT_OT_ProfileNodeTrees(bpy.types.Operator):
+    """ Lists the size and nesting of every node tree, heaviest first """
+    bl_idname = "ndptnodes.profilenodetrees"
+    bl_label = "Lists the size and nesting of every node tree, heaviest first"
+    bl_options = {"REGISTER"}
+    
+    # Enable button condition
+    @classmethod
+    def poll(cls, context):
+        return True
+    
+    # Button is pressed
+    def execute(self, context):
+        # Start
+        scene = context.scene
+        
+        # Log settings
+        self.report({'INFO'},f"Profiling node trees")
+        #logging.info(f"profiling node trees")
+        
+        # Clear previous results
+        scene.ndpt.NDPT_OT_ProfileNodeTrees_Results.clear()
+        
+        # Run the function
+        results = ndpt_functions.profile_node_trees()
+        
+        for r in results:
+            item = scene.ndpt.NDPT_OT_ProfileNodeTrees_Results.add()
+            item.name = r['name']
+            item.nodes = r['nodes']
+            item.links = r['links']
+            item.depth = r['depth']
+            item.expanded = str(r['expanded'])
+            item.users = r['users']
+        
+        self.report({'INFO'}, f"Profiled {len(results)} node trees.")
+
+        return {'FINISHED'}
+
+
 # Merge duplicate node groups operator
 class NDPT_OT_FindNodeParents(bpy.types.Operator):
     """ Find which node groups contain this node group """
@@ -379,18 +624,20 @@ class NDPT_OT_FindNodeParents(bpy.types.Operator):
         #logging.info(f"finding node parents")
         #logging.info(f"settings:")
         #logging.info(f"node group name: {nodegroupname}")
+        #logging.info(f"search mode: {context.scene.ndpt.NDPT_OT_FindNodeParents_SearchMode}")
 
         # Clear previous results
         scene.ndpt.NDPT_OT_FindNodeParents_Results.clear()
         
         # Run the function
-        results = ndpt_functions.node_group_list_parents(nodegroupname = context.scene.ndpt.NDPT_OT_FindNodeParents_DefaultNodeGroup)
+        result, rows = ndpt_functions.node_group_list_parents(nodegroupname = context.scene.ndpt.NDPT_OT_FindNodeParents_DefaultNodeGroup, searchmode = context.scene.ndpt.NDPT_OT_FindNodeParents_SearchMode)
         
-        for r in results:
+        for depth, text in rows:
             item = scene.ndpt.NDPT_OT_FindNodeParents_Results.add()
-            item.name = r
+            item.name = text
+            item.depth = depth
         
-        self.report({'INFO'}, f"Found {len(results) - 1} results.")
+        report_results(self, result)
 
         return {'FINISHED'}
 
@@ -410,7 +657,13 @@ def report_results(op, result):
         op.report({'INFO'}, str(result))
 
 # Function to dynamically fetch all node groups in the scene
+# The items are cached until a node group is added, removed or renamed, as this runs on every redraw
 def get_node_groups(node_type="BOTH"):
+    signature = tuple(bpy.data.node_groups.keys())
+    return ndpt_utils.get_cached_enum_items(("node_groups", node_type), signature, lambda: list_node_groups(node_type))
+
+# Build the list of node groups for the dropdowns
+def list_node_groups(node_type="BOTH"):
     items = [("None", "None", "No node group selected")]  # Add "None" as the first option
     
     # Check the filtering option and gather appropriate node groups
@@ -424,29 +677,37 @@ def get_node_groups(node_type="BOTH"):
     
     return items
 
-# Get all node groups in the scene
-def get_all_node_groups(self,context):
-    items = get_node_groups(node_type = "BOTH")
-    return items
+# Search node groups by name as you type, from an index of the names
+def search_node_groups(self, context, edit_text):
+    return ndpt_utils.node_group_search_index.search(edit_text, self.NDPT_OT_FindNodeParents_TreeType)
 
 # Get geometry nodes groups
 def get_geometry_node_groups(self,context):
     items = get_node_groups(node_type = "GEOMETRY")
     return items
     
+# Run the live asymmetry check once when it's turned on, and drop its state when it's turned off
+def update_live_asymmetry(self, context):
+    if self.NDPT_OT_LiveAsymmetry_Enabled:
+        ndpt_functions.live_asymmetry_update()
+    else:
+        ndpt_utils.live_asymmetry_states.clear()
+
+# Drop the planned merge when its settings change, it would no longer match them
+def clear_merge_plan(self, context):
+    self.NDPT_OT_MergeDuplicateNodeGroups_Plan.clear()
+
 # Function to retrieve UV maps from the active object
+# The items are cached until the UV maps change, as this runs on every redraw
 def get_uv_maps(self, context):
-    items = []
     obj = context.object
     
     # Check if the active object has mesh data and UV maps
     if obj and obj.type == 'MESH' and obj.data.uv_layers:
-        for uv in obj.data.uv_layers:
-            items.append((uv.name, uv.name, ""))
-    else:
-        items.append(("None", "None", "No UV maps found"))
-
-    return items
+        names = tuple(obj.data.uv_layers.keys())
+        return ndpt_utils.get_cached_enum_items("uv_maps", names, lambda: [(name, name, "") for name in names])
+    
+    return ndpt_utils.get_cached_enum_items("uv_maps", None, lambda: [("None", "None", "No UV maps found")])
 
 # -------------------------------------------------------------------------------
 
@@ -454,6 +715,7 @@ def get_uv_maps(self, context):
 class NDPT_NodeParentResult(bpy.types.PropertyGroup):
     """Item representing a single node parent result"""
     name: bpy.props.StringProperty(name="Parent Node Group Name")
+    depth: bpy.props.IntProperty(name="Depth in the results tree")
 
 # UI List for showing node group parent results
 class NDPT_UL_NodeParentResults(bpy.types.UIList):
@@ -461,7 +723,56 @@ class NDPT_UL_NodeParentResults(bpy.types.UIList):
     bl_idname = "NDPT_UL_NodeParentResults"
 
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
-        layout.label(text=item.name)
+        # Indent nested results to show the chain
+        row = layout.row(align=True)
+        for i in range(item.depth):
+            row.label(text="", icon='BLANK1')
+        row.label(text=item.name)
+
+# Data type for a step of a planned node group merge
+class NDPT_MergePlanStep(bpy.types.PropertyGroup):
+    """Item representing a single step of a planned merge"""
+    name: bpy.props.StringProperty(name="Node Group Name")
+    action: bpy.props.StringProperty(name="Action")
+    target: bpy.props.StringProperty(name="Replaced With")
+    new_name: bpy.props.StringProperty(name="New Name")
+    users: bpy.props.IntProperty(name="Users")
+    digest: bpy.props.StringProperty(name="Content Digest")
+
+# UI List for showing a planned node group merge
+class NDPT_UL_MergePlan(bpy.types.UIList):
+    """UI list to show what a node group merge would do"""
+    bl_idname = "NDPT_UL_MergePlan"
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+        if item.action == "Replace":
+            result = "removed" if not item.new_name else f"renamed to {item.new_name}"
+            layout.label(text=f"{item.name} -> {item.target} ({item.users} users, {result})", icon='ARROW_LEFTRIGHT')
+        elif item.action == "Keep":
+            renamed = f" as {item.new_name}" if item.new_name != item.name else ""
+            layout.label(text=f"Keep {item.name}{renamed} ({item.users} users)", icon='CHECKMARK')
+        else:
+            layout.label(text=f"Rename {item.name} to {item.new_name}", icon='SORTALPHA')
+
+# Data type for the profile of a node tree
+class NDPT_NodeTreeProfile(bpy.types.PropertyGroup):
+    """Item representing the profile of a single node tree"""
+    name: bpy.props.StringProperty(name="Node Tree Name")
+    nodes: bpy.props.IntProperty(name="Nodes")
+    links: bpy.props.IntProperty(name="Links")
+    depth: bpy.props.IntProperty(name="Nesting Depth")
+    expanded: bpy.props.StringProperty(name="Expanded Nodes")  # Grows with every nesting level, past what an IntProperty holds
+    users: bpy.props.IntProperty(name="Users")
+
+# UI List for showing node tree profiles
+class NDPT_UL_NodeTreeProfiles(bpy.types.UIList):
+    """UI list to show the profile of every node tree"""
+    bl_idname = "NDPT_UL_NodeTreeProfiles"
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+        row = layout.row()
+        row.label(text=item.name)
+        row.label(text=f"{item.nodes} nodes, {item.links} links, depth {item.depth}, {item.expanded} expanded, {item.users} users")
 
 # --------------------------------------------------------------------------------
 # Panels
@@ -503,6 +814,18 @@ class NDPT_PT_Sidebar_Object(bpy.types.Panel):
         # Button Settings
         box.prop(context.scene.ndpt, "NDPT_OT_JoinGeometryNodes_DifferentiateMaterials")
         
+        # Separate
+        col.separator()
+        
+        # Button
+        prop = box.operator(NDPT_OT_FindDuplicateGeometry.bl_idname, text="Find duplicate geometry")
+        
+        # Button Settings
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectMergeable_MergeDistance")
+        
+        # Button Settings
+        box.prop(context.scene.ndpt, "NDPT_OT_FindDuplicateGeometry_SelectDuplicates")
+        
         # Separate
         col.separator()
 
@@ -516,6 +839,15 @@ class NDPT_PT_Sidebar_Object(bpy.types.Panel):
         # Button
         prop = box.operator(NDPT_OT_SyncDataNames.bl_idname, text="Sync data block names")
         
+        # Separate
+        col.separator()
+        
+        # Button
+        prop = box.operator(NDPT_OT_PurgeUnreachableData.bl_idname, text="Purge unused data")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_PurgeUnreachableData_Delete")
+        
         # Separate
         col.separator()
 
@@ -525,6 +857,7 @@ class NDPT_PT_Sidebar_Object(bpy.types.Panel):
         # Create a box for separation
         box = col.box()
         box.label(text="Edit mode")
+        box.label(text="In object mode these run on the selected meshes", icon='INFO')
         
         # Button
         prop = box.operator(NDPT_OT_SelectHalf.bl_idname, text="Select half")
@@ -544,12 +877,63 @@ class NDPT_PT_Sidebar_Object(bpy.types.Panel):
         # Button
         prop = box.operator(NDPT_OT_SelectAsymmetrical.bl_idname, text="Select asymmetrical vertices")
         
+        # Label
+        box.label(text="Symmetry mode:")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectAsymmetrical_SymmetryMode")
+        
+        # Button settings
+        if context.scene.ndpt.NDPT_OT_SelectAsymmetrical_SymmetryMode == "Topology":
+            box.prop(context.scene.ndpt, "NDPT_OT_SelectAsymmetrical_CenterTolerance")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectAsymmetrical_WriteHeatmap")
+        if context.scene.ndpt.NDPT_OT_SelectAsymmetrical_WriteHeatmap:
+            box.prop(context.scene.ndpt, "NDPT_OT_SelectAsymmetrical_HeatmapRange")
+        
+        # Button settings, shared with Select mergeable vertices
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectAsymmetrical_UseEvaluated")
+        
+        # Button settings, shared with Select mergeable vertices
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectAsymmetrical_FrameLargestIsland")
+        
+        # Separate
+        col.separator()
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_LiveAsymmetry_Enabled")
+        
+        # Live count
+        if context.scene.ndpt.NDPT_OT_LiveAsymmetry_Enabled and context.object and context.object.type == 'MESH':
+            state = ndpt_utils.live_asymmetry_states.get(context.object.data.session_uid)
+            if state is not None:
+                box.label(text=f"Asymmetrical vertices: {state['count']}")
+        
+        # Separate
+        col.separator()
+        
+        # Button
+        prop = box.operator(NDPT_OT_SymmetrizeAsymmetrical.bl_idname, text="Symmetrize asymmetrical vertices")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_SymmetrizeAsymmetrical_SnapTolerance")
+        
         # Separate
         col.separator()
         
         # Button
         prop = box.operator(NDPT_OT_SelectMergeable.bl_idname, text="Select mergeable vertices")
         
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectMergeable_MergeDistance")
+        
+        # Separate
+        col.separator()
+        
+        # Button
+        prop = box.operator(NDPT_OT_SelectDegenerate.bl_idname, text="Select degenerate geometry")
+        
         # Separate
         col.separator()
 
@@ -638,6 +1022,27 @@ class NDPT_PT_Sidebar_Armature(bpy.types.Panel):
         
         # Separate
         col.separator()
+        
+        # Button
+        prop = box.operator(NDPT_OT_MirrorVertexGroups.bl_idname, text="Mirror vertex groups")
+        
+        # Label
+        box.label(text="Symmetry axis:")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectHalf_SymmetryAxis")
+        
+        # Label
+        box.label(text="Symmetry mode:")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectAsymmetrical_SymmetryMode")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_MirrorVertexGroups_FlipNames")
+        
+        # Separate
+        col.separator()
 
 class NDPT_PT_Sidebar_Nodes(bpy.types.Panel):
     """Creates a new tab in the sidebar"""
@@ -662,6 +1067,12 @@ class NDPT_PT_Sidebar_Nodes(bpy.types.Panel):
         # Button
         prop = box.operator(NDPT_OT_SelectSimilarNodes.bl_idname, text="Select similar nodes")
         
+        # Label
+        box.label(text="Similar by:")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_SelectSimilarNodes_SimilarBy")
+        
         # Separate
         col.separator()
         
@@ -672,7 +1083,15 @@ class NDPT_PT_Sidebar_Nodes(bpy.types.Panel):
         box.label(text="Node Group:")
         
         # Button settings
-        box.prop(context.scene.ndpt, "NDPT_OT_FindNodeParents_DefaultNodeGroup")
+        row = box.row(align=True)
+        row.prop(context.scene.ndpt, "NDPT_OT_FindNodeParents_TreeType")
+        row.prop(context.scene.ndpt, "NDPT_OT_FindNodeParents_DefaultNodeGroup", icon='VIEWZOOM')
+        
+        # Label
+        box.label(text="Search mode:")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_FindNodeParents_SearchMode")
         
         # Separate
         col.separator()
@@ -684,6 +1103,9 @@ class NDPT_PT_Sidebar_Nodes(bpy.types.Panel):
         else:
             box.label(text="No results yet.")
         
+        # Button
+        prop = box.operator(NDPT_OT_PlanMergeDuplicateNodeGroups.bl_idname, text="Plan merge (dry run)")
+        
         # Button
         prop = box.operator(NDPT_OT_MergeDuplicateNodeGroups.bl_idname, text="Merge duplicate node groups")
         
@@ -693,6 +1115,38 @@ class NDPT_PT_Sidebar_Nodes(bpy.types.Panel):
         # Button settings
         box.prop(context.scene.ndpt, "NDPT_OT_MergeDuplicateNodeGroups_PriorityMode")
         
+        # Label
+        box.label(text="Match mode:")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_MergeDuplicateNodeGroups_MatchMode")
+        
+        # Button settings
+        box.prop(context.scene.ndpt, "NDPT_OT_MergeDuplicateNodeGroups_RemoveDuplicates")
+        
+        # Show the planned merge, which the merge button applies as listed
+        if len(context.scene.ndpt.NDPT_OT_MergeDuplicateNodeGroups_Plan) > 0:
+            box.label(text="Planned merge:")
+            box.template_list("NDPT_UL_MergePlan", "", context.scene.ndpt, "NDPT_OT_MergeDuplicateNodeGroups_Plan", context.scene.ndpt, "NDPT_OT_MergeDuplicateNodeGroups_Plan_Index")
+        
+        # Separate
+        col.separator()
+        
+        #--------------------------------------------------------------------------------------
+        # Profiler
+        
+        # Create a box for separation
+        box = col.box()
+        box.label(text="Profiler")
+        
+        # Button
+        prop = box.operator(NDPT_OT_ProfileNodeTrees.bl_idname, text="Profile node trees")
+        
+        # Show results list
+        if len(context.scene.ndpt.NDPT_OT_ProfileNodeTrees_Results) > 0:
+            box.label(text="Heaviest first:")
+            box.template_list("NDPT_UL_NodeTreeProfiles", "", context.scene.ndpt, "NDPT_OT_ProfileNodeTrees_Results", context.scene.ndpt, "NDPT_OT_ProfileNodeTrees_Results_Index")
+        
         # Separate
         col.separator()
         
@@ -718,6 +1172,22 @@ class NDPT_SceneProperties(bpy.types.PropertyGroup):
         default = True
     )
     
+    # Boolean Property
+    # Find duplicate geometry: select duplicated objects
+    NDPT_OT_FindDuplicateGeometry_SelectDuplicates: bpy.props.BoolProperty(
+        name='Select duplicated objects',
+        description = "Select only the objects that are a full copy of another selected object",
+        default = False
+    )
+    
+    # Boolean Property
+    # Purge unreachable data: delete
+    NDPT_OT_PurgeUnreachableData_Delete: bpy.props.BoolProperty(
+        name='Delete',
+        description = "Delete the unused data that is found, instead of only listing it",
+        default = False
+    )
+    
     # Enum property
     # Convert particle system to curves: default preset name
     NDPT_OT_ConvertParticlesToCurves_DefaultNodeGroup: bpy.props.EnumProperty(
@@ -768,6 +1238,14 @@ class NDPT_SceneProperties(bpy.types.PropertyGroup):
         default = False
     )
     
+    # Boolean Property
+    # Mirror vertex groups: flip names
+    NDPT_OT_MirrorVertexGroups_FlipNames: bpy.props.BoolProperty(
+        name='Flip names',
+        description = "Mirror the weights of left and right groups like 'Arm.L' into their opposite group, creating it if it's missing",
+        default = True
+    )
+    
     # Boolean Property
     # Select half: select center vertices
     NDPT_OT_SelectHalf_SelectCenter: bpy.props.BoolProperty(
@@ -786,12 +1264,125 @@ class NDPT_SceneProperties(bpy.types.PropertyGroup):
     )
     
     # Enum Property
-    # Dropdown for finding node parents
-    NDPT_OT_FindNodeParents_DefaultNodeGroup: bpy.props.EnumProperty(
+    # Select asymmetrical: symmetry mode
+    NDPT_OT_SelectAsymmetrical_SymmetryMode: bpy.props.EnumProperty(
+        name='',
+        description = "How vertices are matched with their counterpart on the other side",
+        items = [("Position", "Position", "Match vertices by their mirrored position"),("Topology", "Topology", "Match vertices by walking the mesh topology from the center line. Works on posed or sculpted meshes")],
+        default = "Position"
+    )
+    
+    # Float Property
+    # Select asymmetrical: center tolerance
+    NDPT_OT_SelectAsymmetrical_CenterTolerance: bpy.props.FloatProperty(
+        name='Center tolerance',
+        description = "Maximum distance from the symmetry plane for an edge to be used as a center line seed in topology mode",
+        default = 0.001,
+        min = 0.0,
+        precision = 6,
+        subtype = 'DISTANCE'
+    )
+    
+    # Boolean Property
+    # Select asymmetrical and mergeable: use the evaluated mesh
+    NDPT_OT_SelectAsymmetrical_UseEvaluated: bpy.props.BoolProperty(
+        name='Evaluated mesh',
+        description = "Check the final mesh with modifiers, shape keys and deformation instead of the base mesh. Vertices can only be selected if the vertex count doesn't change",
+        default = False
+    )
+    
+    # Boolean Property
+    # Select asymmetrical and mergeable: frame the largest island
+    NDPT_OT_SelectAsymmetrical_FrameLargestIsland: bpy.props.BoolProperty(
+        name='Frame largest island',
+        description = "Point the viewport at the largest connected island of found vertices",
+        default = False
+    )
+    
+    # Boolean Property
+    # Select asymmetrical: write heatmap
+    NDPT_OT_SelectAsymmetrical_WriteHeatmap: bpy.props.BoolProperty(
+        name='Write heatmap',
+        description = "Write the distance of each vertex to its mirrored counterpart into the 'ndpt_asymmetry_distance' attribute and the 'ndpt_asymmetry' color attribute",
+        default = False
+    )
+    
+    # Float Property
+    # Select asymmetrical: heatmap range
+    NDPT_OT_SelectAsymmetrical_HeatmapRange: bpy.props.FloatProperty(
+        name='Heatmap range',
+        description = "Distance that is shown as fully red in the heatmap color attribute",
+        default = 0.01,
+        min = 0.000001,
+        precision = 6,
+        subtype = 'DISTANCE'
+    )
+    
+    # Boolean Property
+    # Live asymmetry: enabled
+    NDPT_OT_LiveAsymmetry_Enabled: bpy.props.BoolProperty(
+        name='Live asymmetry check',
+        description = "Keep checking the active mesh for asymmetrical vertices while modelling. Updates the count and the 'ndpt_asymmetrical' attribute shortly after each change",
+        default = False,
+        update = update_live_asymmetry
+    )
+    
+    # Float Property
+    # Symmetrize asymmetrical: snap tolerance
+    NDPT_OT_SymmetrizeAsymmetrical_SnapTolerance: bpy.props.FloatProperty(
+        name='Snap tolerance',
+        description = "Maximum distance between an asymmetrical vertex and the mirrored position of its counterpart for it to be snapped",
+        default = 0.001,
+        min = 0.0,
+        precision = 6,
+        subtype = 'DISTANCE'
+    )
+    
+    # Float Property
+    # Select mergeable: merge distance
+    NDPT_OT_SelectMergeable_MergeDistance: bpy.props.FloatProperty(
+        name='Merge distance',
+        description = "Maximum distance between vertices to consider them mergeable",
+        default = 0.0001,
+        min = 0.00000001,
+        precision = 6,
+        subtype = 'DISTANCE'
+    )
+    
+    # Enum Property
+    # Select similar nodes: similar by
+    NDPT_OT_SelectSimilarNodes_SimilarBy: bpy.props.EnumProperty(
+        name = '',
+        description = "What nodes are compared on",
+        items = [("Type", "Type", "Nodes of the same type, and group nodes with the same node group"),("Operation", "Operation", "Nodes of the same type with the same operation or mode, like math nodes doing the same operation"),("DataType", "Data type", "Nodes of the same type with the same data type"),("BlendMode", "Blend mode", "Nodes of the same type with the same blend mode, like mix nodes"),("Inputs", "Inputs", "Nodes of the same type with the same values in the inputs that aren't linked")],
+        default = "Type"
+    )
+    
+    # String Property
+    # Search field for finding node parents
+    NDPT_OT_FindNodeParents_DefaultNodeGroup: bpy.props.StringProperty(
         name = '',
         description = "Search which node groups contain this node group",
-        items = get_all_node_groups,
-        default = None
+        default = "",
+        search = search_node_groups
+    )
+    
+    # Enum Property
+    # Find node parents: tree type of the searched node groups
+    NDPT_OT_FindNodeParents_TreeType: bpy.props.EnumProperty(
+        name = '',
+        description = "Only search node groups of this type",
+        items = [("ALL", "All", "Search all node groups"),("GEOMETRY", "Geometry", "Only search geometry node groups"),("SHADER", "Shader", "Only search shader node groups"),("COMPOSITING", "Compositing", "Only search compositing node groups")],
+        default = "ALL"
+    )
+
+    # Enum Property
+    # Find node parents: search mode
+    NDPT_OT_FindNodeParents_SearchMode: bpy.props.EnumProperty(
+        name = '',
+        description = "What to search for",
+        items = [("Parents", "Parents", "Data blocks that use this node group directly"),("Ancestors", "All users", "Everything that uses this node group, directly or through other node groups, as a tree"),("Descendants", "Contents", "Every node group this node group uses, directly or nested in other node groups, as a tree")],
+        default = "Parents"
     )
 
     # Collection property for node parent search results
@@ -804,13 +1395,51 @@ class NDPT_SceneProperties(bpy.types.PropertyGroup):
     )
 
     
+    # Collection property for node tree profiles
+    NDPT_OT_ProfileNodeTrees_Results: bpy.props.CollectionProperty(
+        type=NDPT_NodeTreeProfile
+    )
+    
+    NDPT_OT_ProfileNodeTrees_Results_Index: bpy.props.IntProperty(
+        default=0
+    )
+    
     # Enum Property
     # Merge duplicate node groups: Priority mode
     NDPT_OT_MergeDuplicateNodeGroups_PriorityMode: bpy.props.EnumProperty(
         name='',
         description = "Priority mode",
         items = [("Oldest", "Oldest", "Prioritizes the oldest node group with the lowest suffix number"),("Newest", "Newest", "Prioritizes the newest node group with the higest suffix number")],
-        default = "Oldest"
+        default = "Oldest",
+        update = clear_merge_plan
+    )
+    
+    # Enum Property
+    # Merge duplicate node groups: Match mode
+    NDPT_OT_MergeDuplicateNodeGroups_MatchMode: bpy.props.EnumProperty(
+        name='',
+        description = "How duplicates are found",
+        items = [("Content", "Content", "Node groups with the same nodes, settings, links and inputs are duplicates, whatever their name"),("Name", "Name", "Node groups with the same name apart from a .### suffix are duplicates, even if they were edited differently")],
+        default = "Content",
+        update = clear_merge_plan
+    )
+    
+    # Boolean Property
+    # Merge duplicate node groups: remove duplicates
+    NDPT_OT_MergeDuplicateNodeGroups_RemoveDuplicates: bpy.props.BoolProperty(
+        name='Remove duplicates',
+        description = "Delete the duplicates after replacing them, instead of keeping them with a .old suffix",
+        default = False,
+        update = clear_merge_plan
+    )
+    
+    # Collection property for the planned merge
+    NDPT_OT_MergeDuplicateNodeGroups_Plan: bpy.props.CollectionProperty(
+        type=NDPT_MergePlanStep
+    )
+    
+    NDPT_OT_MergeDuplicateNodeGroups_Plan_Index: bpy.props.IntProperty(
+        default=0
     )
 
 # List of enabled classes
@@ -821,19 +1450,30 @@ classes = [
     NDPT_PT_Sidebar_Nodes,
     NDPT_OT_ToggleShapeKeys,
     NDPT_OT_JoinGeometryNodes,
+    NDPT_OT_FindDuplicateGeometry,
     NDPT_OT_SyncDataNames,
+    NDPT_OT_PurgeUnreachableData,
     NDPT_OT_ConvertParticlesToCurves,
     NDPT_OT_ConvertParticlesAll,
     NDPT_OT_ApplyArmatureModifiers,
     NDPT_OT_ConvertScaleToLocation,
+    NDPT_OT_MirrorVertexGroups,
     NDPT_OT_SelectHalf,
     NDPT_OT_SelectAsymmetrical,
+    NDPT_OT_SymmetrizeAsymmetrical,
     NDPT_OT_SelectMergeable,
+    NDPT_OT_SelectDegenerate,
     NDPT_OT_SelectSimilarNodes,
     NDPT_OT_FindNodeParents,
     NDPT_OT_MergeDuplicateNodeGroups,
+    NDPT_OT_PlanMergeDuplicateNodeGroups,
+    NDPT_OT_ProfileNodeTrees,
     NDPT_NodeParentResult,
     NDPT_UL_NodeParentResults,
+    NDPT_MergePlanStep,
+    NDPT_UL_MergePlan,
+    NDPT_NodeTreeProfile,
+    NDPT_UL_NodeTreeProfiles,
     NDPT_SceneProperties,
 ]
 
@@ -848,6 +1488,15 @@ def register():
     if not hasattr(bpy.types.Scene, "ndpt"):
         bpy.types.Scene.ndpt = bpy.props.PointerProperty(type=NDPT_SceneProperties)
 
+    # Register handlers
+    bpy.app.handlers.load_post.append(ndpt_utils.clear_caches)
+    bpy.app.handlers.depsgraph_update_post.append(ndpt_functions.live_asymmetry_depsgraph_update)
+    bpy.app.handlers.depsgraph_update_post.append(ndpt_utils.update_node_group_index)
+    bpy.app.handlers.undo_post.append(ndpt_utils.invalidate_node_group_index)
+    bpy.app.handlers.redo_post.append(ndpt_utils.invalidate_node_group_index)
+    bpy.app.handlers.undo_post.append(ndpt_utils.clear_live_asymmetry_states)
+    bpy.app.handlers.redo_post.append(ndpt_utils.clear_live_asymmetry_states)
+
     # Log   
     #logging.info("NDP Tools Enabled")
 
@@ -855,6 +1504,24 @@ def register():
 # Delete all the custom settings buttons
 def unregister():
 
+    # Unregister handlers
+    if ndpt_utils.clear_caches in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(ndpt_utils.clear_caches)
+    if ndpt_functions.live_asymmetry_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(ndpt_functions.live_asymmetry_depsgraph_update)
+    if ndpt_utils.update_node_group_index in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(ndpt_utils.update_node_group_index)
+    if ndpt_utils.invalidate_node_group_index in bpy.app.handlers.undo_post:
+        bpy.app.handlers.undo_post.remove(ndpt_utils.invalidate_node_group_index)
+    if ndpt_utils.invalidate_node_group_index in bpy.app.handlers.redo_post:
+        bpy.app.handlers.redo_post.remove(ndpt_utils.invalidate_node_group_index)
+    if ndpt_utils.clear_live_asymmetry_states in bpy.app.handlers.undo_post:
+        bpy.app.handlers.undo_post.remove(ndpt_utils.clear_live_asymmetry_states)
+    if ndpt_utils.clear_live_asymmetry_states in bpy.app.handlers.redo_post:
+        bpy.app.handlers.redo_post.remove(ndpt_utils.clear_live_asymmetry_states)
+    if bpy.app.timers.is_registered(ndpt_functions.live_asymmetry_update):
+        bpy.app.timers.unregister(ndpt_functions.live_asymmetry_update)
+
     # Unregister button settings
     if hasattr(bpy.types.Scene, "ndpt"):
         del bpy.types.Scene.ndpt
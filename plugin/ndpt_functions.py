@@ -1,8 +1,10 @@
 import bpy
 import logging
 import os
-import bmesh
-from mathutils import Vector
+import numpy as np
+
+# Import helpers
+from . import ndpt_utils
 
 # Function to toggle all shape keys
 def toggle_shape_keys(**kwargs):
@@ -72,6 +74,41 @@ def sync_data_block_names():
     return msgs
 
 
+# Function to find node groups, materials, meshes and images that no scene uses, and optionally delete them
+def purge_unreachable_data(**kwargs):
+    # Initiate results
+    msgs = []
+    
+    # Get settings
+    delete = kwargs.get('delete', False)
+    
+    # Find everything that can't be reached from a scene, a fake user or an asset, in one pass over the file
+    labels = {'node_groups': "Node group", 'materials': "Material", 'meshes': "Mesh", 'images': "Image"}
+    unreachable = ndpt_utils.find_unreachable_data(labels.keys())
+    
+    # List them
+    ids = []
+    for collection, found in unreachable.items():
+        for id in found:
+            msgs.append(f"{labels[collection]}: {id.name} ({id.users} users)")
+        ids.extend(found)
+    counts = ", ".join(f"{len(found)} {collection.replace('_', ' ')}" for collection, found in unreachable.items())
+    
+    if not ids:
+        msgs.append("No unused data found")
+        return msgs
+    
+    # Delete them all at once
+    if delete:
+        bpy.data.batch_remove(ids)
+        ndpt_utils.node_group_index.invalidate()
+        msgs.append(f"Deleted {len(ids)} unused data blocks: {counts}")
+    else:
+        msgs.append(f"Found {len(ids)} unused data blocks: {counts}")
+    
+    return msgs
+
+
 # Conversion operation
 def particles_to_curves(input_particle_system,**kwargs):
     # Initiate results
@@ -581,14 +618,27 @@ def convert_scale_to_loc():
     return msgs
 
 
+# Group the flagged vertices of an object into connected islands and add them to the report
+# Returns the world space bounding box of the largest island and its size
+def report_flagged_islands(obj, coords, mask, msgs):
+    edges = ndpt_utils.get_edge_vertices(obj.data)
+    sizes, mins, maxs = ndpt_utils.find_islands(coords, edges, mask)
+    if len(sizes) == 0:
+        return None
+
+    msgs.append(f"{obj.name}: {len(sizes)} islands")
+    msgs.extend(ndpt_utils.describe_islands(sizes, mins, maxs))
+    return sizes[0], ndpt_utils.world_bounds(obj, mins[0], maxs[0])
+
+
 # Function to select half of the vertices of a model
 def select_model_half(**kwargs):
     # Initiate results
     msgs = []
     
-    # Check that we are in edit mode
-    if bpy.context.mode != 'EDIT_MESH':
-        msgs.append("Error: Must be in Edit Mode to use this function")
+    # Check that we are in edit mode or object mode
+    if bpy.context.mode not in ('EDIT_MESH', 'OBJECT'):
+        msgs.append("Error: Must be in Edit Mode or Object Mode to use this function")
         return msgs
     
     # Get the input arguments
@@ -598,47 +648,28 @@ def select_model_half(**kwargs):
     # Set tolerance for the center selection
     tolerance = 0.00000001
     
-    # Ensure we are working on the active object and get the mesh
-    obj = bpy.context.active_object
-    bm = bmesh.from_edit_mesh(obj.data)
-
-    # Initialize axis and direction
-    axis_idx = 0  # Default is X axis
-    direction = 1  # Default is positive
+    # Work on every mesh in edit mode, or the selected meshes in object mode, and get the vertex positions
+    objects = ndpt_utils.get_mesh_objects()
+    if not objects:
+        msgs.append("No mesh objects selected")
+        return msgs
+    coords_list = [ndpt_utils.get_vertex_coordinates(obj) for obj in objects]
 
     # Determine which axis and direction to use based on symmetryaxis
-    if symmetryaxis == '-X':
-        axis_idx = 0
-        direction = -1
-    elif symmetryaxis == '+X':
-        axis_idx = 0
-        direction = 1
-    elif symmetryaxis == '-Y':
-        axis_idx = 1
-        direction = -1
-    elif symmetryaxis == '+Y':
-        axis_idx = 1
-        direction = 1
-    elif symmetryaxis == '-Z':
-        axis_idx = 2
-        direction = -1
-    elif symmetryaxis == '+Z':
-        axis_idx = 2
-        direction = 1
-
-    # Deselect all vertices first
-    bpy.ops.mesh.select_all(action='DESELECT')
+    axis_idx, direction = ndpt_utils.get_symmetry_axis(symmetryaxis)
 
     # Select vertices based on position relative to the center and axis
-    for v in bm.verts:
-        pos = v.co[axis_idx] * direction
-        if pos > 0 or (selectcenter and abs(pos) < tolerance):
-            v.select = True
-    
-    # Update the mesh
-    bmesh.update_edit_mesh(obj.data)
+    masks = ndpt_utils.run_in_threads(lambda coords: ndpt_utils.half_mask(coords, axis_idx, direction, selectcenter, tolerance), coords_list)
+
+    # Deselect all vertices first. In object mode the whole selection is written at once instead
+    if bpy.context.mode == 'EDIT_MESH':
+        bpy.ops.mesh.select_all(action='DESELECT')
+
+    # Write the selection and update the meshes
+    for obj, mask in zip(objects, masks):
+        ndpt_utils.set_vertex_selection(obj, mask)
     
-    msgs.append("Selected half")
+    msgs.append(f"Selected half of {len(objects)} objects" if len(objects) > 1 else "Selected half")
     return msgs
 
 
@@ -647,139 +678,520 @@ def select_asymmetrical_vertices(**kwargs):
     # Initiate results
     msgs = []
 
-    # Check that we are in edit mode
-    if bpy.context.mode != 'EDIT_MESH':
-        msgs.append("Error: Must be in Edit Mode to use this function")
+    # Check that we are in edit mode or object mode
+    if bpy.context.mode not in ('EDIT_MESH', 'OBJECT'):
+        msgs.append("Error: Must be in Edit Mode or Object Mode to use this function")
         return msgs
     
     # Get the input arguments
     symmetryaxis = kwargs.get('symmetryaxis', '+X')
+    symmetrymode = kwargs.get('symmetrymode', "Position")
+    centertolerance = kwargs.get('centertolerance', 0.001)
+    useevaluated = kwargs.get('useevaluated', False)
+    writeheatmap = kwargs.get('writeheatmap', False)
+    heatmaprange = kwargs.get('heatmaprange', 0.01)
+    frameisland = kwargs.get('frameisland', False)
 
     # Set tolerance (float precision handling)
-    tolerance = 0.00000001
-    
-    # Ensure we are working on the active object and get the mesh
-    obj = bpy.context.active_object
-    bm = bmesh.from_edit_mesh(obj.data)
-
-    # Initialize axis and direction
-    axis_idx = 0  # Default is X axis
-    direction = 1  # Default is positive
+    tolerance = centertolerance if symmetrymode == "Topology" else 0.00000001
 
     # Determine which axis and direction to use based on symmetryaxis
-    if symmetryaxis == '-X':
-        axis_idx = 0
-        direction = -1
-    elif symmetryaxis == '+X':
-        axis_idx = 0
-        direction = 1
-    elif symmetryaxis == '-Y':
-        axis_idx = 1
-        direction = -1
-    elif symmetryaxis == '+Y':
-        axis_idx = 1
-        direction = 1
-    elif symmetryaxis == '-Z':
-        axis_idx = 2
-        direction = -1
-    elif symmetryaxis == '+Z':
-        axis_idx = 2
-        direction = 1
-
-    # Deselect all vertices first
-    bpy.ops.mesh.select_all(action='DESELECT')
-
-    # Counter for asymmetrical vertices
+    axis_idx, direction = ndpt_utils.get_symmetry_axis(symmetryaxis)
+    key = (axis_idx, tolerance, symmetrymode, useevaluated)
+    
+    # Work on every mesh in edit mode, or the selected meshes in object mode. Read the mesh data here, bpy can only be used from the main thread
+    # The mirror map of each mesh is cached and only recomputed after the mesh changes
+    objects = ndpt_utils.get_mesh_objects()
+    if not objects:
+        msgs.append("No mesh objects selected")
+        return msgs
+    depsgraph = bpy.context.evaluated_depsgraph_get() if useevaluated else None
+    jobs = []
+    for obj in objects:
+        if useevaluated:
+            # Check the final deformed mesh, with modifiers and shape keys, without applying anything
+            coords, signature, faces = ndpt_utils.get_evaluated_mesh_data(obj, depsgraph, faces = symmetrymode == "Topology")
+            mirror_map = ndpt_utils.get_cached_mirror_map(obj.data, signature, key)
+        else:
+            coords = ndpt_utils.get_vertex_coordinates(obj)
+            signature = ndpt_utils.get_mesh_signature(obj.data, coords)
+            mirror_map = ndpt_utils.get_cached_mirror_map(obj.data, signature, key)
+            faces = None
+            if mirror_map is None and symmetrymode == "Topology":
+                faces = ndpt_utils.get_face_vertices(obj.data)
+        jobs.append((coords, signature, mirror_map, faces))
+
+    # Analyze each object
+    def analyze(job):
+        coords, signature, mirror_map, faces = job
+        if symmetrymode == "Topology":
+            # Match vertices by walking the mesh from the center line, which works on posed or sculpted meshes
+            # Every vertex on the specified side whose topology has no counterpart on the other side is selected
+            if mirror_map is None:
+                mirror_map = ndpt_utils.compute_topology_mirror_map(faces, coords, axis_idx, tolerance)
+            mask = ndpt_utils.asymmetry_mask(coords, axis_idx, direction, mirror_map)
+        else:
+            # Find the vertices on the specified side that have no symmetrical counterpart
+            if mirror_map is None:
+                mirror_map = ndpt_utils.compute_mirror_map(coords, axis_idx, tolerance)
+            mask = ndpt_utils.asymmetry_mask(coords, axis_idx, direction, mirror_map)
+        return mirror_map, mask
+
+    results = ndpt_utils.run_in_threads(analyze, jobs)
+
+    # Deselect all vertices first. In object mode the whole selection is written at once instead
+    if bpy.context.mode == 'EDIT_MESH':
+        bpy.ops.mesh.select_all(action='DESELECT')
+
+    # Write the selections and update the meshes
     asymmetrical_count = 0
+    largest = None
+    heatmaps = []
+    for obj, job, (mirror_map, mask) in zip(objects, jobs, results):
+        ndpt_utils.set_cached_mirror_map(obj.data, job[1], key, mirror_map)
+        asymmetrical_count += int(mask.sum())
+
+        # Evaluated vertices only map back to the original ones if the modifiers didn't change the vertex count
+        if len(mask) == len(obj.data.vertices):
+            ndpt_utils.set_vertex_selection(obj, mask)
+
+            # Measure the distance of each vertex to its mirrored counterpart for the heatmap
+            if writeheatmap:
+                heatmaps.append((obj, ndpt_utils.asymmetry_distances(job[0], axis_idx, mirror_map)))
+
+            # Group the flagged vertices into islands so large results stay readable
+            island = report_flagged_islands(obj, job[0], mask, msgs)
+            if island is not None and (largest is None or island[0] > largest[0]):
+                largest = island
+        else:
+            msgs.append(f"Warning: The evaluated mesh of {obj.name} has a different vertex count, its vertices can't be selected")
+
+        if symmetrymode == "Topology" and len(mirror_map) > 0 and (mirror_map < 0).all():
+            msgs.append(f"Warning: No center line edges found in {obj.name}, nothing could be matched")
+        if len(objects) > 1:
+            msgs.append(f"{obj.name}: {int(mask.sum())} asymmetrical vertices")
+
+    # Write the distances, and a color attribute to view them, in bulk
+    # The edit mesh can only be written per vertex, so leave edit mode for the write
+    if heatmaps:
+        editmode = bpy.context.mode == 'EDIT_MESH'
+        if editmode:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        for obj, distances in heatmaps:
+            ndpt_utils.set_vertex_attribute(obj, "ndpt_asymmetry_distance", distances, 'FLOAT')
+            ndpt_utils.set_vertex_attribute(obj, "ndpt_asymmetry", ndpt_utils.heatmap_colors(distances / heatmaprange), 'FLOAT_COLOR')
+            obj.data.color_attributes.active_color_name = "ndpt_asymmetry"
+        if editmode:
+            bpy.ops.object.mode_set(mode='EDIT')
+
+    if len(objects) > 1:
+        msgs.append(f"Found {asymmetrical_count} asymmetrical vertices in {len(objects)} objects.")
+    else:
+        msgs.append(f"Found {asymmetrical_count} asymmetrical vertices.")
 
-    # Select vertices on the specified side that have no symmetrical counterpart
-    for v in bm.verts:
-        pos = v.co[axis_idx] * direction
-        
-        # We check only the vertices on the positive side
-        if pos > 0:
-            # Create a mirror coordinate on the opposite side
-            mirrored_pos = v.co.copy()
-            mirrored_pos[axis_idx] = -mirrored_pos[axis_idx]  # Flip the coordinate on the symmetry axis
-            
-            # Search for a corresponding vertex on the opposite side within the tolerance
-            mirrored_vertex_found = False
-            for mv in bm.verts:
-                if (mv.co - mirrored_pos).length < tolerance:
-                    mirrored_vertex_found = True
-                    break
-            
-            # If no symmetrical vertex was found, select this vertex
-            if not mirrored_vertex_found:
-                v.select = True
-                asymmetrical_count += 1
+    # Frame the largest island in the viewport
+    if frameisland and largest is not None:
+        ndpt_utils.frame_bounds(bpy.context, *largest[1])
     
-    # Update the mesh to reflect changes in the selection
-    bmesh.update_edit_mesh(obj.data)
+    return msgs
+
 
-    msgs.append(f"Found {asymmetrical_count} asymmetrical vertices.")
+# Live asymmetry check. Runs on the active mesh a moment after its geometry stops changing
+# Only the vertices that moved since the last pass are rechecked, against the coordinates cached from it
+def live_asymmetry_update():
+    scene = bpy.context.scene
+    obj = bpy.context.view_layer.objects.active
+    if obj is None or obj.type != 'MESH' or not scene.ndpt.NDPT_OT_LiveAsymmetry_Enabled:
+        return None
+
+    axis_idx, direction = ndpt_utils.get_symmetry_axis(scene.ndpt.NDPT_OT_SelectHalf_SymmetryAxis)
+    coords = ndpt_utils.get_vertex_coordinates(obj)
+    state = ndpt_utils.live_asymmetry_states.get(obj.data.session_uid)
+
+    # Start over if the topology or the settings changed, otherwise only recheck what moved
+    if state is None or len(state['coords']) != len(coords) or state['settings'][:2] != (axis_idx, direction):
+        state = ndpt_utils.build_live_asymmetry_state(coords, axis_idx, direction)
+        ndpt_utils.live_asymmetry_states.clear()
+        ndpt_utils.live_asymmetry_states[obj.data.session_uid] = state
+        changed = None
+    else:
+        changed = ndpt_utils.update_live_asymmetry_state(state, coords)
+        if len(changed) == 0:
+            return None
+
+    # Keep the attribute current, writing only the vertices whose result changed
+    # The write updates the depsgraph too, flag it so the handler doesn't check the mesh again for it
+    ndpt_utils.set_vertex_attribute(obj, "ndpt_asymmetrical", state['mask'].astype(np.float32), 'FLOAT', changed)
+    state['count'] = int(state['mask'].sum())
+    state['own_write'] = True
+
+    # Redraw the sidebar with the new count
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    return None
+
+
+# Depsgraph handler for the live asymmetry check. Waits until the geometry stops changing before checking
+@bpy.app.handlers.persistent
+def live_asymmetry_depsgraph_update(scene, depsgraph):
+    if not scene.ndpt.NDPT_OT_LiveAsymmetry_Enabled:
+        return
+
+    obj = bpy.context.view_layer.objects.active
+    if obj is None or obj.type != 'MESH':
+        return
+
+    for update in depsgraph.updates:
+        if update.is_updated_geometry and update.id.original in (obj, obj.data):
+            # Skip the update caused by writing the attribute of the last check
+            state = ndpt_utils.live_asymmetry_states.get(obj.data.session_uid)
+            if state is not None and state.pop('own_write', False):
+                return
+            
+            # Restart the timer on every change, so a stroke is only checked once it's done
+            if bpy.app.timers.is_registered(live_asymmetry_update):
+                bpy.app.timers.unregister(live_asymmetry_update)
+            bpy.app.timers.register(live_asymmetry_update, first_interval=0.25)
+            return
+
+
+# Function to snap near-miss asymmetrical vertices to their exact mirrored positions
+def symmetrize_asymmetrical_vertices(**kwargs):
+    # Initiate results
+    msgs = []
+
+    # Check that we are in edit mode or object mode
+    if bpy.context.mode not in ('EDIT_MESH', 'OBJECT'):
+        msgs.append("Error: Must be in Edit Mode or Object Mode to use this function")
+        return msgs
     
+    # Get the input arguments
+    symmetryaxis = kwargs.get('symmetryaxis', '+X')
+    snaptolerance = kwargs.get('snaptolerance', 0.001)
+
+    # Set tolerance (float precision handling)
+    tolerance = 0.00000001
+
+    # Determine which axis and direction to use based on symmetryaxis
+    axis_idx, direction = ndpt_utils.get_symmetry_axis(symmetryaxis)
+    key = (axis_idx, tolerance, "Position", False)
+
+    # Work on every mesh in edit mode, or the selected meshes in object mode
+    moved_count = 0
+    objects = ndpt_utils.get_mesh_objects()
+    if not objects:
+        msgs.append("No mesh objects selected")
+        return msgs
+    snapped = []
+    for obj in objects:
+        coords = ndpt_utils.get_vertex_coordinates(obj)
+        signature = ndpt_utils.get_mesh_signature(obj.data, coords)
+        mirror_map = ndpt_utils.get_cached_mirror_map(obj.data, signature, key)
+        if mirror_map is None:
+            mirror_map = ndpt_utils.compute_mirror_map(coords, axis_idx, tolerance)
+
+        # Snap the opposite side of every near-miss pair to the positive side in one pass
+        coords, moved = ndpt_utils.symmetrize_coordinates(coords, axis_idx, direction, mirror_map, snaptolerance)
+        if len(moved) > 0:
+            snapped.append((obj, coords))
+        moved_count += len(moved)
+
+        if len(objects) > 1:
+            msgs.append(f"{obj.name}: snapped {len(moved)} vertices")
+
+    # Write the new coordinates in bulk. The edit mesh can only be written per vertex, so leave edit mode for the write
+    if snapped:
+        editmode = bpy.context.mode == 'EDIT_MESH'
+        if editmode:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        for obj, coords in snapped:
+            ndpt_utils.set_vertex_coordinates(obj, coords)
+        if editmode:
+            bpy.ops.object.mode_set(mode='EDIT')
+
+    msgs.append(f"Snapped {moved_count} vertices to their mirrored positions.")
+    return msgs
+
+
+# Function to mirror all vertex group weights across the symmetry axis, flipping left and right group names
+def mirror_vertex_groups(**kwargs):
+    # Initiate results
+    msgs = []
+
+    # Check that we are in object mode or weight paint mode, vertex groups can't be written in edit mode
+    if bpy.context.mode not in ('OBJECT', 'PAINT_WEIGHT'):
+        msgs.append("Error: Must be in Object Mode or Weight Paint Mode to use this function")
+        return msgs
+
+    # Get the input arguments
+    symmetryaxis = kwargs.get('symmetryaxis', '+X')
+    symmetrymode = kwargs.get('symmetrymode', "Position")
+    centertolerance = kwargs.get('centertolerance', 0.001)
+    flipnames = kwargs.get('flipnames', True)
+
+    # Set tolerance (float precision handling)
+    tolerance = centertolerance if symmetrymode == "Topology" else 0.00000001
+
+    # Determine which axis and direction to use based on symmetryaxis
+    axis_idx, direction = ndpt_utils.get_symmetry_axis(symmetryaxis)
+    key = (axis_idx, tolerance, symmetrymode, False)
+
+    objects = [obj for obj in ndpt_utils.get_mesh_objects() if obj.vertex_groups]
+    if not objects:
+        msgs.append("No mesh objects with vertex groups selected")
+        return msgs
+
+    for obj in objects:
+        # Reuse the mirror map of the asymmetry tools, computed once for every group
+        coords = ndpt_utils.get_vertex_coordinates(obj)
+        signature = ndpt_utils.get_mesh_signature(obj.data, coords)
+        mirror_map = ndpt_utils.get_cached_mirror_map(obj.data, signature, key)
+        if mirror_map is None:
+            if symmetrymode == "Topology":
+                mirror_map = ndpt_utils.compute_topology_mirror_map(ndpt_utils.get_face_vertices(obj.data), coords, axis_idx, tolerance)
+            else:
+                mirror_map = ndpt_utils.compute_mirror_map(coords, axis_idx, tolerance)
+            ndpt_utils.set_cached_mirror_map(obj.data, signature, key, mirror_map)
+
+        # Pair every group with its flipped name, creating the missing side
+        vertex_groups = obj.vertex_groups
+        group_map = np.arange(len(vertex_groups), dtype=np.int64)
+        if flipnames:
+            for vg in list(vertex_groups):
+                flipped = bpy.utils.flip_name(vg.name)
+                if flipped != vg.name:
+                    if vertex_groups.get(flipped) is None:
+                        vertex_groups.new(name=flipped)
+                    group_map[vg.index] = vertex_groups[flipped].index
+            group_map = np.concatenate([group_map, np.arange(len(group_map), len(vertex_groups), dtype=np.int64)])
+
+        # Read all the weights once and mirror them in bulk
+        vertices, groups, weights = ndpt_utils.get_vertex_group_weights(obj.data)
+        targets, target_vertices, target_groups, target_weights = ndpt_utils.mirror_vertex_group_weights(coords, axis_idx, direction, mirror_map, vertices, groups, weights, group_map)
+
+        # Clear the old weights of the rewritten vertices, then add the new ones with a call per group and weight
+        # There is no bulk write for vertex group weights, so painted weights, which are rarely equal, still take
+        # close to one call per assignment. Flat weights like 0 and 1 take one call per group
+        target_list = np.flatnonzero(targets).tolist()
+        for vg in vertex_groups:
+            vg.remove(target_list)
+        order = np.lexsort((target_weights, target_groups))
+        target_vertices, target_groups, target_weights = target_vertices[order], target_groups[order], target_weights[order]
+        starts = np.flatnonzero(np.concatenate([[True], (np.diff(target_groups) != 0) | (np.diff(target_weights) != 0)]))
+        for start, end in zip(starts.tolist(), np.append(starts[1:], len(order)).tolist()):
+            vertex_groups[int(target_groups[start])].add(target_vertices[start:end].tolist(), float(target_weights[start]), 'REPLACE')
+        obj.data.update()
+
+        msgs.append(f"{obj.name}: mirrored {len(vertex_groups)} vertex groups onto {len(target_list)} vertices")
+
+        # Vertices on the other side with no counterpart keep their weights
+        unmatched = int(np.count_nonzero((coords[:, axis_idx] * direction < -tolerance) & (mirror_map < 0)))
+        if unmatched > 0:
+            msgs.append(f"Warning: {unmatched} vertices of {obj.name} have no mirrored counterpart and were left as they were")
+
     return msgs
 
 
-# Function to select only vertices that have a duplicate in the exact same location
-def select_mergeable_vertices():
+# Function to select only vertices that have a duplicate within the merge distance
+def select_mergeable_vertices(**kwargs):
     # Initiate results
     msgs = []
     
-    # Check that we are in edit mode
-    if bpy.context.mode != 'EDIT_MESH':
-        msgs.append("Error: Must be in Edit Mode to use this function")
+    # Check that we are in edit mode or object mode
+    if bpy.context.mode not in ('EDIT_MESH', 'OBJECT'):
+        msgs.append("Error: Must be in Edit Mode or Object Mode to use this function")
         return msgs
     
-    # Set tolerance decimals for comparing vertices
-    tolerance = 8
-
-    # Ensure we are working on the active object and get the mesh
-    obj = bpy.context.active_object
-    bm = bmesh.from_edit_mesh(obj.data)
+    # Get the input arguments
+    mergedistance = kwargs.get('mergedistance', 0.0001)
+    useevaluated = kwargs.get('useevaluated', False)
+    frameisland = kwargs.get('frameisland', False)
+
+    # Work on every mesh in edit mode, or the selected meshes in object mode, and get the vertex positions
+    objects = ndpt_utils.get_mesh_objects()
+    if not objects:
+        msgs.append("No mesh objects selected")
+        return msgs
+    if useevaluated:
+        # Check the final deformed mesh, with modifiers and shape keys, without applying anything
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        coords_list = [ndpt_utils.get_evaluated_mesh_data(obj, depsgraph)[0] for obj in objects]
+    else:
+        coords_list = [ndpt_utils.get_vertex_coordinates(obj) for obj in objects]
     
-    # Dictionary to store vertex positions and corresponding vertices
-    position_dict = {}
-    duplicate_count = 0
+    # Group the vertices into clusters of duplicates
+    # Neighbouring grid cells are searched too, so vertices right across a cell border still match
+    results = ndpt_utils.run_in_threads(lambda coords: ndpt_utils.find_duplicate_clusters(coords, mergedistance), coords_list)
     
-    # Loop through all vertices and store them in a dictionary by position
-    for v in bm.verts:
-        position = v.co
-        
-        # Use the position as the key, rounded for tolerance
-        key = (round(position.x, tolerance), round(position.y, tolerance), round(position.z, tolerance))
-        
-        if key not in position_dict:
-            position_dict[key] = [v]
+    # Deselect all vertices first. In object mode the whole selection is written at once instead
+    if bpy.context.mode == 'EDIT_MESH':
+        bpy.ops.mesh.select_all(action='DESELECT')
+
+    # Write the selections and update the meshes
+    duplicate_count = 0
+    total_clusters = 0
+    largest = None
+    for obj, coords, (clusters, cluster_count) in zip(objects, coords_list, results):
+        mask = clusters >= 0
+
+        # Evaluated vertices only map back to the original ones if the modifiers didn't change the vertex count
+        if len(mask) == len(obj.data.vertices):
+            ndpt_utils.set_vertex_selection(obj, mask)
+
+            # Group the flagged vertices into islands so large results stay readable
+            island = report_flagged_islands(obj, coords, mask, msgs)
+            if island is not None and (largest is None or island[0] > largest[0]):
+                largest = island
         else:
-            position_dict[key].append(v)
+            msgs.append(f"Warning: The evaluated mesh of {obj.name} has a different vertex count, its vertices can't be selected")
+        count = int(mask.sum()) - cluster_count  # Count the extra vertices as duplicates
+        duplicate_count += count
+        total_clusters += cluster_count
+        if len(objects) > 1:
+            msgs.append(f"{obj.name}: {count} mergeable vertices in {cluster_count} clusters")
+    
+    if len(objects) > 1:
+        msgs.append(f"Found {duplicate_count} mergeable (duplicate) vertices in {total_clusters} clusters across {len(objects)} objects.")
+    else:
+        msgs.append(f"Found {duplicate_count} mergeable (duplicate) vertices in {total_clusters} clusters.")
+
+    # Frame the largest island in the viewport
+    if frameisland and largest is not None:
+        ndpt_utils.frame_bounds(bpy.context, *largest[1])
+    return msgs
+
+
+# Function to select duplicate faces, zero area faces, zero length edges and loose geometry
+def select_degenerate_geometry(**kwargs):
+    # Initiate results
+    msgs = []
+    
+    # Check that we are in edit mode or object mode
+    if bpy.context.mode not in ('EDIT_MESH', 'OBJECT'):
+        msgs.append("Error: Must be in Edit Mode or Object Mode to use this function")
+        return msgs
     
-    # Deselect all vertices first
-    bpy.ops.mesh.select_all(action='DESELECT')
+    # Get the input arguments
+    mergedistance = kwargs.get('mergedistance', 0.0001)
 
-    # Loop through the dictionary to find duplicate vertices
-    for verts in position_dict.values():
-        if len(verts) > 1:
-            # Select all vertices in the same position
-            for v in verts:
-                v.select = True
-            duplicate_count += len(verts) - 1  # Count the extra vertices as duplicates
+    # Work on every mesh in edit mode, or the selected meshes in object mode. Read the mesh arrays here, bpy can only be used from the main thread
+    objects = ndpt_utils.get_mesh_objects()
+    if not objects:
+        msgs.append("No mesh objects selected")
+        return msgs
+    jobs = []
+    for obj in objects:
+        coords = ndpt_utils.get_vertex_coordinates(obj)
+        mesh = obj.data
+        areas = np.empty(len(mesh.polygons), dtype=np.float32)
+        mesh.polygons.foreach_get("area", areas)
+        jobs.append((coords, ndpt_utils.get_edge_vertices(mesh), *ndpt_utils.get_face_arrays(mesh), areas))
+
+    # Check every category for each object in one pass
+    def analyze(job):
+        coords, edges, loop_starts, loop_totals, loop_verts, loop_edges, areas = job
+        results = ndpt_utils.find_degenerate_geometry(coords, edges, loop_starts, loop_totals, loop_verts, loop_edges, areas, mergedistance)
+        return results, ndpt_utils.degenerate_element_masks(results)
+
+    results = ndpt_utils.run_in_threads(analyze, jobs)
+
+    # Deselect all vertices first. In object mode the whole selection is written at once instead
+    if bpy.context.mode == 'EDIT_MESH':
+        bpy.ops.mesh.select_all(action='DESELECT')
+
+    # Select the flagged elements themselves and add up the counts of each category
+    totals = {}
+    for obj, (categories, masks) in zip(objects, results):
+        ndpt_utils.set_element_selection(obj, *masks)
+        for name, flagged in categories.items():
+            totals[name] = totals.get(name, 0) + int(flagged.sum())
+        if len(objects) > 1:
+            msgs.append(f"{obj.name}: " + ", ".join(f"{int(flagged.sum())} {name.lower()}" for name, flagged in categories.items()))
+    
+    for name, count in totals.items():
+        msgs.append(f"{name}: {count}")
+    msgs.append(f"Found {sum(totals.values())} duplicate or degenerate elements.")
+    return msgs
+
+
+# Function to find coincident vertices and duplicated objects across the selected meshes
+def select_duplicate_geometry(**kwargs):
+    # Initiate results
+    msgs = []
+    
+    # Check that we are in object mode
+    if bpy.context.mode != 'OBJECT':
+        msgs.append("Error: Must be in Object Mode to use this function")
+        return msgs
+    
+    # Get the input arguments
+    mergedistance = kwargs.get('mergedistance', 0.0001)
+    selectduplicates = kwargs.get('selectduplicates', False)
     
-    # Update the mesh to reflect changes in the selection
-    bmesh.update_edit_mesh(obj.data)
+    # Get the selected meshes
+    objects = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
+    if len(objects) < 2:
+        msgs.append("Select at least two mesh objects")
+        return msgs
     
-    msgs.append(f"Found {duplicate_count} mergeable (duplicate) vertices.")
+    # Read the vertices once per mesh, then move every object into world space
+    local_coords = {}
+    for obj in objects:
+        if obj.data not in local_coords:
+            local_coords[obj.data] = ndpt_utils.get_vertex_coordinates(obj)
+    world_coords = [ndpt_utils.to_world_space(obj, local_coords[obj.data]) for obj in objects]
+    
+    # Find the vertices that coincide with a vertex of another object
+    element_counts = [(len(obj.data.edges), len(obj.data.polygons)) for obj in objects]
+    masks, duplicates = ndpt_utils.find_cross_object_duplicates(world_coords, mergedistance, element_counts)
+    
+    # Select the coincident vertices. Objects sharing a mesh get the selection of all of them
+    mesh_masks = {}
+    for obj, mask in zip(objects, masks):
+        if obj.data in mesh_masks:
+            mesh_masks[obj.data][1] |= mask
+        else:
+            mesh_masks[obj.data] = [obj, mask.copy()]
+    for obj, mask in mesh_masks.values():
+        ndpt_utils.set_vertex_selection(obj, mask)
+    coincident_count = sum(int(mask.sum()) for mask in masks)
+    
+    # Report each duplicated object once, keeping the first one of each pair
+    reported = set()
+    redundant = []
+    for a, b in duplicates:
+        if (b, a) in reported:
+            continue
+        reported.add((a, b))
+        original, duplicate = (objects[a], objects[b]) if a < b else (objects[b], objects[a])
+        msgs.append(f"{duplicate.name} duplicates {original.name}")
+        if duplicate not in redundant:
+            redundant.append(duplicate)
+    
+    # Select only the redundant copies
+    if selectduplicates and redundant:
+        for obj in objects:
+            obj.select_set(False)
+        for obj in redundant:
+            obj.select_set(True)
+        bpy.context.view_layer.objects.active = redundant[0]
+    
+    msgs.append(f"Found {coincident_count} coincident vertices and {len(redundant)} duplicated objects across {len(objects)} objects.")
     return msgs
 
 
 # Function to find groups that contain a certain node group
+# Returns the messages for the report, and (depth, text) rows for the results list
 def node_group_list_parents(**kwargs):
     # Initiate results
     msgs = []
+    rows = []
     
     # Get settings
     nodegroupname = kwargs.get('nodegroupname', "None")
+    searchmode = kwargs.get('searchmode', "Parents")
     
     # Start, check that node exists
     #logging.info(f"----------------------------------------------------------------------------------")
@@ -789,151 +1201,242 @@ def node_group_list_parents(**kwargs):
     else:
         #logging.info("Node group not found")
         msgs.append("Node group not found")
-        return msgs
+        return msgs, rows
     
     # Start list
     #logging.info(f"Listing parents for '{target_nodegroup.name}'")
     #logging.info(f"")
     
-    # Log number of owners
-    counter = 0
-    
-    # Iterate over every existing node group
-    for nodegroup in bpy.data.node_groups:
-        if target_nodegroup != nodegroup:
-            for node in nodegroup.nodes:
-                if node.bl_rna.identifier == 'GeometryNodeGroup' or node.bl_rna.identifier == 'ShaderNodeGroup':
-                    if node.node_tree == target_nodegroup:
-                        #logging.info(f"Node group '{nodegroup.name}' contains '{target_nodegroup.name}'")
-                        msgs.append(f"Node group: {nodegroup.name}")
-                        counter = counter + 1
-    
-    # Iterate over every existing material
-    for nodegroup in bpy.data.materials:
-        if nodegroup.node_tree and nodegroup.node_tree.nodes:
-            for node in nodegroup.node_tree.nodes:
-                if node.bl_rna.identifier == 'GeometryNodeGroup' or node.bl_rna.identifier == 'ShaderNodeGroup':
-                    if node.node_tree == target_nodegroup:
-                        #logging.info(f"Material '{nodegroup.name}' contains '{target_nodegroup.name}'")
-                        msgs.append(f"Material: {nodegroup.name}")
-                        counter = counter + 1
+    # Look up the node group in the usage index, which only scans what changed since the last search
+    index = ndpt_utils.node_group_index
+    labels = ndpt_utils.NodeGroupIndex.owners
+    if searchmode == "Parents":
+        # Data blocks that use the node group directly
+        parents = index.sort_keys(index.get_parents(target_nodegroup.name))
+        for collection, name in parents:
+            #logging.info(f"{labels[collection]} '{name}' contains '{target_nodegroup.name}'")
+            rows.append((0, f"{labels[collection]}: {name}"))
+        counter = len(parents)
+    else:
+        # Full chain of users, or of nested node groups, as a tree
+        descendants = searchmode == "Descendants"
+        for depth, collection, name, repeated in index.get_tree(target_nodegroup.name, descendants):
+            rows.append((depth, f"{labels[collection]}: {name}" + (" (listed above)" if repeated else "")))
+        if descendants:
+            counter = len(index.get_descendants(target_nodegroup.name))
+        else:
+            counter = len(index.get_ancestors(target_nodegroup.name))
     
     # Finalize
     #logging.info(f"")
     #logging.info(f"There are {counter} instances containing '{target_nodegroup.name}'")
     
     msgs.append(f"Total: {counter} results.")
-    return msgs
+    return msgs, rows
 
 
-# Function to replace duplicate node groups that end in .001 with the original
-def node_group_merge_duplicates(**kwargs):
+# Function to plan the merge of duplicate node groups, without changing anything
+# Returns a list of steps, each a dictionary with the action, the node group name, the node group it's replaced
+# with, its name afterwards (empty if it's removed), its number of users and the digest of its content
+def node_group_merge_plan(**kwargs):
     # Initiate results
-    msgs = []
+    plan = []
     
     # Get settings
     priority = kwargs.get('prioritymode', "Oldest")
+    removeduplicates = kwargs.get('removeduplicates', False)
+    matchmode = kwargs.get('matchmode', "Content")
     
     # Dictionary to store grouped node groups
     node_group_dict = {}
     
-    # Step 1: Group node groups by their base name (before the .### suffix)
+    # Step 1: Group node groups by their base name (before the .### suffix), or by a digest of their content
+    # Only node groups of the same tree type can replace each other, so the type is part of the key either way
+    # Each node group is digested once, nested node groups reuse the digest of their node group
+    # Matching by name never digests anything, so its plan steps get an empty digest
+    hasher = ndpt_utils.NodeTreeHasher() if matchmode == "Content" else None
+    def digest(nodegroup):
+        return hasher.tree_digest(nodegroup) if hasher is not None else ""
+    
     for nodegroup in bpy.data.node_groups:
-        if len(nodegroup.name) > 4 and nodegroup.name[-4] == '.' and nodegroup.name[-3:].isdigit():
-            base_name = nodegroup.name[:-4]  # Strip the .### suffix
+        if matchmode == "Content":
+            key = (nodegroup.bl_idname, digest(nodegroup))
         else:
-            base_name = nodegroup.name
+            key = (nodegroup.bl_idname, ndpt_utils.get_base_name(nodegroup.name))  # Strip the .### suffix
         
-        if base_name not in node_group_dict:
-            node_group_dict[base_name] = []
-        node_group_dict[base_name].append(nodegroup)
+        if key not in node_group_dict:
+            node_group_dict[key] = []
+        node_group_dict[key].append(nodegroup)
+    
+    # Keep track of the names as they will be after each step, to know which names are free
+    names = set(bpy.data.node_groups.keys())
     
     # Step 2: Sort and determine which node group to keep
-    for base_name, group_list in node_group_dict.items():
+    for group_list in node_group_dict.values():
         if len(group_list) > 1:  # Only consider groups with duplicates
+            # Matching by content, a group can hold node groups with different names. Rank them by their .### number,
+            # which is the only hint of their age, then keep the one with the most users so the fewest get replaced
             if priority == "Oldest":
-                # Sort by name to get the original or the lowest .###
-                group_list.sort(key=lambda ng: ng.name)
+                # Sort by the .### number to get the original or the lowest .###
+                group_list.sort(key=lambda ng: (ndpt_utils.get_name_suffix(ng.name), -ng.users, ng.name))
             elif priority == "Newest":
-                # Sort by name to get the highest .### number
-                group_list.sort(key=lambda ng: ng.name, reverse=True)
+                # Sort by the .### number to get the highest .### number
+                group_list.sort(key=lambda ng: (-ndpt_utils.get_name_suffix(ng.name), -ng.users, ng.name))
             
             # The first element after sorting will be the prioritized one
             main_node_group = group_list[0]
             
-            # Step 3: Add .old suffix to all other duplicates
+            # Step 3: Replace every use of the duplicates with the main node group, and add a .old suffix to them
             for duplicate in group_list[1:]:
-                duplicate.name += ".old"  # Add .old suffix to duplicates
-                #logging.info(f"Renamed {duplicate.name} to {duplicate.name}")
-
+                names.discard(duplicate.name)
+                new_name = "" if removeduplicates else duplicate.name + ".old"
+                if new_name:
+                    names.add(new_name)
+                plan.append({'action': "Replace", 'name': duplicate.name, 'target': main_node_group.name, 'new_name': new_name, 'users': duplicate.users, 'digest': digest(duplicate)})
+            
             # If we're prioritizing the newest, handle renaming accordingly
+            new_name = main_node_group.name
             if priority == "Newest":
-                # Check if the main node group (oldest one in "Newest" mode) has a .###
-                #if not (len(main_node_group.name) > 4 and main_node_group.name[-4] == '.' and main_node_group.name[-3:].isdigit()):
-                # Add ".old" to the oldest node if it doesn't have .###
-                if len(main_node_group.name) > 4 and main_node_group.name[-4] == '.' and main_node_group.name[-3:].isdigit():
-                    main_node_group.name = main_node_group.name[:-4]
-                    #logging.info(f"Renamed main node group to {main_node_group.name}")
-
-            # Step 4: Replace references to duplicates in all node groups and materials
-            for duplicate in group_list[1:]:
-                # Iterate through node groups
-                for other_group in bpy.data.node_groups:
-                    for node in other_group.nodes:
-                        if node.type == 'GROUP' and node.node_tree == duplicate:
-                            node.node_tree = main_node_group
-                            #logging.info(f"Replaced duplicate {duplicate.name} with {main_node_group.name} in node group {other_group.name}")
-                
-                # Iterate through materials
-                for material in bpy.data.materials:
-                    if material.use_nodes:
-                        for node in material.node_tree.nodes:
-                            if node.type == 'GROUP' and node.node_tree == duplicate:
-                                node.node_tree = main_node_group
-                                #logging.info(f"Replaced duplicate {duplicate.name} with {main_node_group.name} in material {material.name}")
-
+                # Matching by content, the base name may belong to a different node group
+                base_name = ndpt_utils.get_base_name(main_node_group.name)
+                if base_name != main_node_group.name and base_name not in names:
+                    new_name = base_name
+                    names.discard(main_node_group.name)
+                    names.add(new_name)
+            plan.append({'action': "Keep", 'name': main_node_group.name, 'target': "", 'new_name': new_name, 'users': main_node_group.users, 'digest': digest(main_node_group)})
+        
         else:  # No duplicates, but has a .00# suffix
             single_group = group_list[0]
-            if len(single_group.name) > 4 and single_group.name[-4] == '.' and single_group.name[-3:].isdigit():
+            base_name = ndpt_utils.get_base_name(single_group.name)
+            if base_name != single_group.name and base_name not in names:
                 # Rename to remove the .### suffix
-                single_group.name = base_name
-                #logging.info(f"Renamed non-duplicate node group {single_group.name} to {base_name}")
+                names.discard(single_group.name)
+                names.add(base_name)
+                plan.append({'action': "Rename", 'name': single_group.name, 'target': "", 'new_name': base_name, 'users': single_group.users, 'digest': digest(single_group)})
+    
+    return plan
 
+
+# Function to apply a merge plan made by node_group_merge_plan, without searching for duplicates again
+# Set validate for a plan that was stored earlier, to check that its node groups weren't edited since
+def node_group_merge_apply(**kwargs):
+    # Initiate results
+    msgs = []
+    
+    # Get settings
+    plan = kwargs.get('plan', [])
+    validate = kwargs.get('validate', False)
+    
+    # Look up the node groups of the plan by name, the plan is out of date if any of them is gone or was edited
+    # Only plans matched by content have digests to check. The targets are planned to be kept, so their content
+    # is checked by their own step
+    node_groups = {nodegroup.name: nodegroup for nodegroup in bpy.data.node_groups}
+    hasher = ndpt_utils.NodeTreeHasher() if validate else None
+    for step in plan:
+        if step['name'] not in node_groups or (step['target'] and step['target'] not in node_groups) or (hasher is not None and step.get('digest') and hasher.tree_digest(node_groups[step['name']]) != step['digest']):
+            msgs.append(f"Error: Node group '{step['name']}' changed since the merge was planned, plan it again")
+            return msgs
+    
+    # Replace every use of the duplicates with the main node group at once
+    # This covers node groups, materials, modifiers and any other user, nested or not
+    replaced = [step for step in plan if step['action'] == "Replace"]
+    for step in replaced:
+        node_groups[step['name']].user_remap(node_groups[step['target']])
+        #logging.info(f"Replaced duplicate {step['name']} with {step['target']}")
+    
+    # Rename the duplicates first so the names they free up can be used by the rest
+    for step in replaced:
+        node_groups[step['name']].name += ".old"
+        #logging.info(f"Renamed {step['name']} to {node_groups[step['name']].name}")
+    for step in plan:
+        if step['action'] != "Replace" and step['new_name'] != step['name']:
+            node_groups[step['name']].name = step['new_name']
+            #logging.info(f"Renamed {step['name']} to {step['new_name']}")
+    
+    # Delete the duplicates that are planned to be removed, which have no users left, in one go
+    removed = [node_groups[step['name']] for step in replaced if not step['new_name']]
+    if removed:
+        bpy.data.batch_remove(removed)
+        msgs.append(f"Removed {len(removed)} duplicate node groups")
+    if len(replaced) > len(removed):
+        msgs.append(f"Renamed {len(replaced) - len(removed)} duplicate node groups with a .old suffix")
+    
+    # Users were remapped outside the depsgraph too, so the usage index has to be rebuilt
+    ndpt_utils.node_group_index.invalidate()
+    
     msgs.append("Finished merging and renaming node groups")
     return msgs
 
 
+# Function to replace duplicate node groups that end in .001 with the original
+def node_group_merge_duplicates(**kwargs):
+    return node_group_merge_apply(plan = node_group_merge_plan(**kwargs))
+
+
+# Function to profile the complexity of every node tree in the file
+# Returns a dictionary per tree with its name, node count, link count, nesting depth, expanded node count and users,
+# heaviest first
+def profile_node_trees():
+    # Initiate results
+    rows = []
+    
+    # Node groups, and the node trees of materials, worlds and the rest
+    profiler = ndpt_utils.NodeTreeProfiler()
+    trees = [("Node group", nodegroup.name, nodegroup, nodegroup.users) for nodegroup in bpy.data.node_groups]
+    for collection, label in ndpt_utils.NodeGroupIndex.owners.items():
+        if collection in ('node_groups', 'objects'):
+            continue
+        for owner in getattr(bpy.data, collection):
+            tree = getattr(owner, 'node_tree', None)
+            if tree is not None:
+                trees.append((label, owner.name, tree, owner.users))
+    
+    # Profile them, nested node groups are only profiled once
+    for label, name, tree, users in trees:
+        nodes, links, depth, expanded = profiler.profile(tree)
+        rows.append({'name': f"{label}: {name}", 'nodes': nodes, 'links': links, 'depth': depth, 'expanded': expanded, 'users': users})
+    
+    rows.sort(key=lambda row: row['expanded'], reverse=True)
+    return rows
+
+
 # Function to select similar nodes in the current editor
-def nodes_select_similar():
+def nodes_select_similar(**kwargs):
     # Initiate results
     msgs = []
     
-    # get all node editor windows and the node groups open in them
-    nodegroups = []
-    for area in bpy.context.window_manager.windows[0].screen.areas:
-        if area.type == 'NODE_EDITOR':
-            for space in area.spaces:
-                if hasattr(space, 'edit_tree') and space.edit_tree is not None:
-                    nodegroups.append(space.edit_tree.nodes)
-    
-    # iterate over every node group
-    for nodegroup in nodegroups:
-        activenode = nodegroup.active
-        activenode_type = activenode.bl_rna.identifier
+    # Get settings
+    similarby = kwargs.get('similarby', "Type")
+    
+    # get the node trees open in every node editor of every window, once each
+    nodetrees = {}
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'NODE_EDITOR':
+                for space in area.spaces:
+                    if hasattr(space, 'edit_tree') and space.edit_tree is not None:
+                        nodetrees[space.edit_tree.as_pointer()] = space.edit_tree
+    
+    if not nodetrees:
+        msgs.append("No node editors open")
+        return msgs
+    
+    # iterate over every node tree
+    hasher = ndpt_utils.NodeTreeHasher()
+    selected = 0
+    for nodetree in nodetrees.values():
+        activenode = nodetree.nodes.active
+        if activenode is None:
+            continue
         
-        # iterate over every node inside
-        for node in nodegroup:
-            # check if node has the same identifier type
-            if node.bl_rna.identifier == activenode_type:
-                # check if it's a node group and if so only select it if it has the same group
-                print(activenode_type)
-                if activenode_type == 'GeometryNodeGroup' or activenode_type == 'ShaderNodeGroup':
-                    if node.node_tree == activenode.node_tree:
-                        node.select = True
-                # if its not a node group node, just select all similar
-                else:
-                    node.select = True
-    msgs.append("Selected all similar nodes")
+        # compare the signature of every node of the same type inside with the one of the active node
+        activesignature = ndpt_utils.get_node_signature(activenode, similarby, hasher)
+        for node in nodetree.nodes:
+            if node.bl_idname == activenode.bl_idname and ndpt_utils.get_node_signature(node, similarby, hasher) == activesignature:
+                node.select = True
+                selected += 1
+    
+    msgs.append(f"Selected {selected} similar nodes")
     return msgs
 
 
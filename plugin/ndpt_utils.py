@@ -1,3 +1,15 @@
+import bpy
+import bmesh
+import bisect
+import hashlib
+import itertools
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from mathutils import Vector, kdtree
+
 def vectorisclose(vector1, vector2, tolerance=0.0001):
     # Determine if the inputs are correctly utilized.
     if not isinstance(vector1, Vector) or not isinstance(vector2, Vector) or not isinstance(tolerance, float):
@@ -9,4 +21,1294 @@ def vectorisclose(vector1, vector2, tolerance=0.0001):
     for component in range(0, len(vector1)):
         if not abs(vector1[component] - vector2[component]) < abs(tolerance):
             return False
-    return True
\ No newline at end of file
+    return True
+
+
+# --------------------------------------------------------------------------------
+# Vectorized mesh helpers
+# These work on whole NumPy arrays so the edit mode tools don't loop over vertices in Python
+
+# Convert a symmetry axis setting like '+X' into an axis index and a direction
+def get_symmetry_axis(symmetryaxis):
+    axis_idx = "XYZ".index(symmetryaxis[-1])
+    direction = -1 if symmetryaxis[0] == '-' else 1
+    return axis_idx, direction
+
+
+# Read all the vertex coordinates of a mesh object into an (n, 3) array
+def get_vertex_coordinates(obj):
+    # In edit mode the mesh data is out of date until we write the edit mesh back into it
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+
+    mesh = obj.data
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3).astype(np.float64)
+
+
+# Read the vertex coordinates of the evaluated mesh of an object, with modifiers, shape keys and deformation applied
+# Also returns the signature of the evaluated mesh and optionally its faces, as the mesh is freed afterwards
+def get_evaluated_mesh_data(obj, depsgraph, faces=False):
+    # Keep the original mesh in sync too, the results are mapped back onto it
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+
+    eval_obj = obj.evaluated_get(depsgraph)
+    mesh = eval_obj.to_mesh()
+
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3).astype(np.float64)
+    signature = get_mesh_signature(mesh, coords)
+    face_list = get_face_vertices(mesh) if faces else None
+
+    eval_obj.to_mesh_clear()
+    return coords, signature, face_list
+
+
+# Select the vertices of an object from a boolean mask
+# In edit mode this assumes the selection was cleared already, in object mode the whole selection is replaced
+def set_vertex_selection(obj, mask):
+    mesh = obj.data
+
+    if obj.mode != 'EDIT':
+        # Object mode can write the selection of every element in bulk, flushed to the edges and faces
+        mesh.vertices.foreach_set("select", mask)
+        edges = get_edge_vertices(mesh)
+        mesh.edges.foreach_set("select", mask[edges[:, 0]] & mask[edges[:, 1]])
+        if len(mesh.polygons) > 0:
+            loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+            loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+            mesh.polygons.foreach_get("loop_start", loop_starts)
+            mesh.loops.foreach_get("vertex_index", loop_verts)
+            mesh.polygons.foreach_set("select", np.logical_and.reduceat(mask[loop_verts], loop_starts))
+        mesh.update()
+        return
+
+    bm = bmesh.from_edit_mesh(mesh)
+    bm.verts.ensure_lookup_table()
+
+    # Only the flagged vertices are touched, the mask itself was computed in bulk
+    verts = bm.verts
+    for i in np.flatnonzero(mask).tolist():
+        verts[i].select = True
+
+    # Flush to edges and faces depending on the selection mode and update the mesh
+    bm.select_flush_mode()
+    bmesh.update_edit_mesh(mesh)
+
+
+# Select the flagged vertices, edges and faces of an object from boolean masks, without flushing the selection to the
+# elements around them, so elements that only happen to touch flagged ones stay unselected. Selected edges and faces
+# still select their own vertices and edges. In edit mode this assumes the selection was cleared already, in object
+# mode the whole selection is replaced
+def set_element_selection(obj, vert_mask, edge_mask, face_mask):
+    mesh = obj.data
+
+    if obj.mode != 'EDIT':
+        # Add the edges of the flagged faces and the vertices of the flagged edges, then write every element in bulk
+        loop_starts, loop_totals, loop_verts, loop_edges = get_face_arrays(mesh)
+        edge_mask = edge_mask.copy()
+        edge_mask[loop_edges[np.repeat(face_mask, loop_totals)]] = True
+        vert_mask = vert_mask.copy()
+        vert_mask[get_edge_vertices(mesh)[edge_mask].ravel()] = True
+        mesh.vertices.foreach_set("select", vert_mask)
+        mesh.edges.foreach_set("select", edge_mask)
+        mesh.polygons.foreach_set("select", face_mask)
+        mesh.update()
+        return
+
+    # Only the flagged elements are touched. Selecting an edge or a face selects its vertices and edges too
+    bm = bmesh.from_edit_mesh(mesh)
+    for elements, mask in ((bm.verts, vert_mask), (bm.edges, edge_mask), (bm.faces, face_mask)):
+        elements.ensure_lookup_table()
+        for i in np.flatnonzero(mask).tolist():
+            elements[i].select = True
+    bmesh.update_edit_mesh(mesh)
+
+
+# Get the mesh objects to work on, once per mesh data
+# In edit mode these are the objects in edit mode, in object mode the selected objects
+def get_mesh_objects():
+    if bpy.context.mode == 'EDIT_MESH':
+        return [obj for obj in bpy.context.objects_in_mode_unique_data if obj.type == 'MESH']
+
+    objects = []
+    meshes = set()
+    for obj in bpy.context.selected_objects:
+        if obj.type == 'MESH' and obj.data not in meshes:
+            meshes.add(obj.data)
+            objects.append(obj)
+    return objects
+
+
+# Run a function over a list of items in a thread pool and return the results in order
+# Only use it on extracted NumPy data, bpy data must not be accessed outside the main thread
+def run_in_threads(function, items):
+    if len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(len(items), os.cpu_count() or 1)) as pool:
+        return list(pool.map(function, items))
+
+
+# Write all the vertex coordinates of a mesh in bulk
+# The edit mesh can only be written per vertex, so leave edit mode first
+def set_vertex_coordinates(obj, coords):
+    mesh = obj.data
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(coords, dtype=np.float32).ravel())
+    mesh.update()
+
+
+# Write a per vertex attribute from an array, FLOAT takes one value per vertex and FLOAT_COLOR takes four
+# In object mode the whole attribute is written in bulk. In edit mode the attribute lives in the edit mesh, which can
+# only be written per vertex, so there only the given vertex indices are written, if any are given. Leave edit mode
+# first to write a whole attribute
+def set_vertex_attribute(obj, name, values, data_type='FLOAT', indices=None):
+    mesh = obj.data
+
+    if obj.mode == 'EDIT':
+        bm = bmesh.from_edit_mesh(mesh)
+        layers = bm.verts.layers.float_color if data_type == 'FLOAT_COLOR' else bm.verts.layers.float
+        layer = layers.get(name)
+        if layer is None:
+            layer = layers.new(name)
+            indices = None
+        if indices is None:
+            for v, value in zip(bm.verts, values.tolist()):
+                v[layer] = value
+        else:
+            bm.verts.ensure_lookup_table()
+            verts = bm.verts
+            for i, value in zip(indices.tolist(), values[indices].tolist()):
+                verts[i][layer] = value
+        bmesh.update_edit_mesh(mesh)
+    else:
+        attribute = mesh.attributes.get(name)
+        if attribute is not None and (attribute.data_type != data_type or attribute.domain != 'POINT'):
+            mesh.attributes.remove(attribute)
+            attribute = None
+        if attribute is None:
+            attribute = mesh.attributes.new(name, data_type, 'POINT')
+        attribute.data.foreach_set("color" if data_type == 'FLOAT_COLOR' else "value", np.ascontiguousarray(values, dtype=np.float32).ravel())
+        mesh.update()
+
+
+# Map values from 0 to 1 onto a blue, green, red color ramp. Returns an (n, 4) array of colors
+def heatmap_colors(values):
+    t = np.clip(values, 0.0, 1.0)
+    colors = np.ones((len(t), 4), dtype=np.float32)
+    colors[:, 0] = np.clip(2.0 * t - 1.0, 0.0, 1.0)
+    colors[:, 1] = 1.0 - np.abs(2.0 * t - 1.0)
+    colors[:, 2] = np.clip(1.0 - 2.0 * t, 0.0, 1.0)
+    return colors
+
+
+# Nearest point to each query, found with a KD-tree that is built once for all the queries
+# Every query costs a logarithmic search, however far it is from the points or however they are spread
+# Returns the index of the nearest point and the distance to it
+def find_nearest_points(points, queries):
+    indices = np.full(len(queries), -1, dtype=np.int64)
+    distances = np.full(len(queries), np.inf)
+    if len(points) == 0 or len(queries) == 0:
+        return indices, distances
+
+    tree = kdtree.KDTree(len(points))
+    for i, co in enumerate(points.tolist()):
+        tree.insert(co, i)
+    tree.balance()
+
+    found = [tree.find(co) for co in queries.tolist()]
+    indices[:] = [index for co, index, distance in found]
+    distances[:] = [distance for co, index, distance in found]
+    return indices, distances
+
+
+# Spatial hash for finding points within a distance of each other
+class SpatialHash:
+    """ Uniform grid over a set of points for fixed radius neighbour queries """
+
+    def __init__(self, points, cellsize):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.cellsize = float(cellsize)
+
+        # Sort the points by the key of the cell they fall in so a cell is a contiguous range
+        keys = self.cell_keys(self.cells(self.points))
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    # Integer grid cell of each point
+    def cells(self, points):
+        return np.floor(points / self.cellsize).astype(np.int64)
+
+    # Hash grid cells into a single integer. Collisions only add candidates, they are filtered by distance
+    @staticmethod
+    def cell_keys(cells):
+        return (cells[:, 0] * 73856093) ^ (cells[:, 1] * 19349663) ^ (cells[:, 2] * 83492791)
+
+    # Grid cells that the sphere of the distance around each query reaches, one neighbour cell at a time
+    # Yields the indices of the queries that reach a neighbour cell and that cell for each of them
+    def neighbour_cells(self, queries, distance):
+        # Walk the cells from the lowest corner of the bounding box of the sphere, each query only up to its highest
+        # corner. With cells larger than the distance most queries don't cross a border and only need their own cell
+        low = self.cells(queries - distance)
+        high = self.cells(queries + distance)
+        reach = int(np.ceil(2.0 * distance / self.cellsize))
+        for offset in itertools.product(range(reach + 1), repeat=3):
+            offset = np.array(offset, dtype=np.int64)
+            selected = np.flatnonzero(np.all(low + offset <= high, axis=1))
+            if len(selected) > 0:
+                yield selected, low[selected] + offset
+
+    # Find every (query, point) pair closer than the distance. Returns two index arrays
+    # Candidates are expanded in batches of at most maxcandidates, so crowded cells can't blow up the candidate arrays
+    def query_pairs(self, queries, distance, maxcandidates=4000000):
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+
+        query_indices = []
+        point_indices = []
+
+        # Look in every cell the query can reach, so points across a cell border are found too
+        for selected, cells in self.neighbour_cells(queries, distance):
+            keys = self.cell_keys(cells)
+            start = np.searchsorted(self.keys, keys, side='left')
+            counts = np.searchsorted(self.keys, keys, side='right') - start
+            nonempty = counts > 0
+            selected, start, counts = selected[nonempty], start[nonempty], counts[nonempty]
+
+            # Split the queries where the running candidate count passes the cap, a batch holds at least one query
+            ends = np.cumsum(counts)
+            begin = 0
+            while begin < len(counts):
+                stop = max(begin + 1, int(np.searchsorted(ends, ends[begin] - counts[begin] + maxcandidates, side='right')))
+                batch = counts[begin:stop]
+
+                # Expand each query into one candidate per point in the matching cell
+                qi = np.repeat(selected[begin:stop], batch)
+                within = np.arange(len(qi)) - np.repeat(np.cumsum(batch) - batch, batch)
+                pi = self.order[np.repeat(start[begin:stop], batch) + within]
+
+                # Keep the candidates that are actually close enough
+                offsets_to_point = self.points[pi] - queries[qi]
+                close = np.einsum('ij,ij->i', offsets_to_point, offsets_to_point) < distance * distance
+                query_indices.append(qi[close])
+                point_indices.append(pi[close])
+                begin = stop
+
+        if not query_indices:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # Hash collisions can make the same cell show up twice for a query, so remove repeated pairs
+        qi = np.concatenate(query_indices)
+        pi = np.concatenate(point_indices)
+        pairs = np.unique(qi * len(self.points) + pi)
+        return pairs // len(self.points), pairs % len(self.points)
+
+    # Move some of the points without rebuilding the whole hash
+    # Their old entries are dropped and the new ones are inserted into the sorted keys, which is a linear copy instead of a sort
+    def update(self, indices, points):
+        indices = np.asarray(indices, dtype=np.int64)
+        self.points[indices] = points
+
+        moved = np.zeros(len(self.points), dtype=bool)
+        moved[indices] = True
+        keep = ~moved[self.order]
+        keys = self.keys[keep]
+        order = self.order[keep]
+
+        new_keys = self.cell_keys(self.cells(self.points[indices]))
+        sort = np.argsort(new_keys, kind='stable')
+        new_keys = new_keys[sort]
+        positions = np.searchsorted(keys, new_keys)
+        self.keys = np.insert(keys, positions, new_keys)
+        self.order = np.insert(order, positions, indices[sort])
+
+    # Boolean mask of the queries that have at least one point closer than the distance
+    def has_neighbour(self, queries, distance):
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        mask = np.zeros(len(queries), dtype=bool)
+        qi, pi = self.query_pairs(queries, distance)
+        mask[qi] = True
+        return mask
+
+
+# Mask of the vertices on the positive side of the axis, optionally including the center line
+def half_mask(coords, axis_idx, direction, selectcenter=False, tolerance=0.00000001):
+    pos = coords[:, axis_idx] * direction
+    mask = pos > 0
+    if selectcenter:
+        mask |= np.abs(pos) < tolerance
+    return mask
+
+
+# Grid cell size for matching mirrored vertex positions. Cells as small as the tolerance would make most queries
+# cross cell borders, cells of a fraction of the vertex spacing on a surface hold about one vertex each and
+# nearly every query only needs its own cell
+def mirror_cellsize(coords, tolerance):
+    if len(coords) == 0:
+        return tolerance
+    return max(tolerance, 0.25 * np.ptp(coords, axis=0).max() / np.sqrt(len(coords)))
+
+
+# Mirror map of a set of vertex positions: the index of the vertex at the mirrored position of each vertex, or -1
+def compute_mirror_map(coords, axis_idx, tolerance=0.00000001):
+    mirrored = coords.copy()
+    mirrored[:, axis_idx] = -mirrored[:, axis_idx]
+
+    # Vertices on the center line find themselves
+    mirror_map = np.full(len(coords), -1, dtype=np.int64)
+    qi, pi = SpatialHash(coords, mirror_cellsize(coords, tolerance)).query_pairs(mirrored, tolerance)
+    mirror_map[qi] = pi
+    return mirror_map
+
+
+# Read the face and loop arrays of a mesh in bulk
+# Returns the loop start and loop count of each face, and the vertex and edge of each loop
+def get_face_arrays(mesh):
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    return loop_starts, loop_totals, loop_verts, loop_edges
+
+
+# Get the vertex indices of every face of a mesh, read in bulk
+def get_face_vertices(mesh):
+    loop_starts, loop_totals, loop_verts, loop_edges = get_face_arrays(mesh)
+    loop_verts = loop_verts.tolist()
+    return [loop_verts[start:start + total] for start, total in zip(loop_starts.tolist(), loop_totals.tolist())]
+
+
+# Mirror map found by walking the mesh topology instead of comparing positions, so it still works on posed meshes
+# Starts from the edges on the center line and pairs up the faces on both sides of it, then keeps pairing
+# the faces across the edges of each matched pair. Every face is visited once, so it runs in linear time
+# Assumes consistent face normals, mirrored faces wind in opposite directions
+def compute_topology_mirror_map(faces, coords, axis_idx, tolerance=0.001):
+    # Faces around each edge
+    edge_faces = {}
+    for f, verts in enumerate(faces):
+        for s in range(len(verts)):
+            a, b = verts[s - 1], verts[s]
+            edge_faces.setdefault((a, b) if a < b else (b, a), []).append(f)
+
+    # Face on the other side of an edge, only for manifold edges
+    def other_face(a, b, f):
+        around = edge_faces.get((a, b) if a < b else (b, a), ())
+        if len(around) != 2:
+            return None
+        return around[1] if around[0] == f else around[0]
+
+    mirror = [-1] * len(coords)
+    face_done = [False] * len(faces)
+    queue = deque()
+
+    # Seeds: each edge on the center line mirrors onto itself, and so do its vertices
+    center = (np.abs(coords[:, axis_idx]) < tolerance).tolist()
+    for (a, b), around in edge_faces.items():
+        if center[a] and center[b] and len(around) == 2:
+            verts = faces[around[0]]
+            # Walk forwards from the vertex that comes first along the edge in the first face
+            u = a if verts[verts.index(a) - 1] != b else b
+            mirror[a] = a
+            mirror[b] = b
+            queue.append((around[0], around[1], u, u))
+
+    # Pair face f with face g, walking f forwards from u and g backwards from its mirror u2
+    while queue:
+        f, g, u, u2 = queue.popleft()
+        if face_done[f] or face_done[g]:
+            continue
+        fverts, gverts = faces[f], faces[g]
+        k = len(fverts)
+        if len(gverts) != k:
+            continue
+        i, j = fverts.index(u), gverts.index(u2)
+        pairs = [(fverts[(i + s) % k], gverts[(j - s) % k]) for s in range(k)]
+
+        # Skip the pair if it disagrees with a vertex that was already matched
+        if any(mirror[p] not in (-1, q) or mirror[q] not in (-1, p) for p, q in pairs):
+            continue
+        face_done[f] = True
+        face_done[g] = True
+        for p, q in pairs:
+            mirror[p] = q
+            mirror[q] = p
+
+        # Continue with the faces across every edge, the edge runs the other way in the next face
+        for s in range(k):
+            p0, p1 = pairs[s][0], pairs[(s + 1) % k][0]
+            q0, q1 = pairs[s][1], pairs[(s + 1) % k][1]
+            fnext = other_face(p0, p1, f)
+            gnext = other_face(q0, q1, g)
+            if fnext is not None and gnext is not None and not face_done[fnext] and not face_done[gnext]:
+                queue.append((fnext, gnext, p1, q1))
+
+    return np.array(mirror, dtype=np.int64)
+
+
+# Cached mirror maps, by mesh and then by (axis, tolerance). Each entry keeps the signature it was computed for
+mirror_map_cache = {}
+
+
+# Cheap signature of the topology and vertex positions of a mesh, changes with any edit
+def get_mesh_signature(mesh, coords):
+    return (len(mesh.vertices), len(mesh.edges), len(mesh.polygons), zlib.crc32(coords.tobytes()))
+
+
+# Get the cached mirror map of a mesh, or None if the mesh changed since it was computed
+# The key is (axis, tolerance, mode) where mode is either 'Position' or 'Topology'
+def get_cached_mirror_map(mesh, signature, key):
+    cached = mirror_map_cache.get(mesh.session_uid, {}).get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    return None
+
+
+# Store a mirror map in the cache
+def set_cached_mirror_map(mesh, signature, key, mirror_map):
+    mesh_cache = mirror_map_cache.setdefault(mesh.session_uid, {})
+
+    # Any edit changes the signature, which invalidates everything cached for this mesh
+    if any(cached[0] != signature for cached in mesh_cache.values()):
+        mesh_cache.clear()
+    mesh_cache[key] = (signature, mirror_map)
+
+
+# Distance of every vertex to its mirrored counterpart
+# Matched vertices are measured against their match, the rest against the nearest vertex to their mirrored position
+def asymmetry_distances(coords, axis_idx, mirror_map):
+    mirrored = coords.copy()
+    mirrored[:, axis_idx] = -mirrored[:, axis_idx]
+
+    distances = np.empty(len(coords), dtype=np.float64)
+    matched = mirror_map >= 0
+    distances[matched] = np.linalg.norm(mirrored[matched] - coords[mirror_map[matched]], axis=1)
+    distances[~matched] = find_nearest_points(coords, mirrored[~matched])[1]
+    return distances
+
+
+# Mask of the vertices on the positive side of the axis that have no mirrored counterpart
+def asymmetry_mask(coords, axis_idx, direction, mirror_map):
+    return half_mask(coords, axis_idx, direction) & (mirror_map < 0)
+
+
+# Live asymmetry check state, by mesh
+live_asymmetry_states = {}
+
+
+# Build the state of the live asymmetry check for a set of vertex positions
+def build_live_asymmetry_state(coords, axis_idx, direction, tolerance=0.00000001):
+    spatial_hash = SpatialHash(coords, mirror_cellsize(coords, tolerance))
+    mirrored = coords.copy()
+    mirrored[:, axis_idx] = -mirrored[:, axis_idx]
+    mirror_map = np.full(len(coords), -1, dtype=np.int64)
+    qi, pi = spatial_hash.query_pairs(mirrored, tolerance)
+    mirror_map[qi] = pi
+
+    return {
+        'settings': (axis_idx, direction, tolerance),
+        'coords': coords,
+        'hash': spatial_hash,
+        'mirror_map': mirror_map,
+        'mask': half_mask(coords, axis_idx, direction) & (mirror_map < 0),
+    }
+
+
+# Update the live asymmetry check after some vertices moved, only rechecking the vertices that can be affected:
+# the moved ones, the ones matched to a moved vertex and the ones whose mirrored position is near a moved vertex
+# Returns the indices of the vertices whose result changed
+def update_live_asymmetry_state(state, coords):
+    axis_idx, direction, tolerance = state['settings']
+    changed = np.flatnonzero(np.any(coords != state['coords'], axis=1))
+    if len(changed) == 0:
+        return changed
+    state['coords'] = coords
+    spatial_hash = state['hash']
+    spatial_hash.update(changed, coords[changed])
+    mirror_map = state['mirror_map']
+
+    # Mirroring is symmetric, so the vertices near the mirrored new positions are the ones that may match them now
+    mirrored = coords[changed].copy()
+    mirrored[:, axis_idx] = -mirrored[:, axis_idx]
+    nearby = spatial_hash.query_pairs(mirrored, tolerance)[1]
+    moved = np.zeros(len(coords), dtype=bool)
+    moved[changed] = True
+    old_partners = np.flatnonzero((mirror_map >= 0) & moved[mirror_map])
+    affected = np.unique(np.concatenate([changed, old_partners, nearby]))
+
+    # Recheck only those
+    mirrored = coords[affected].copy()
+    mirrored[:, axis_idx] = -mirrored[:, axis_idx]
+    mirror_map[affected] = -1
+    qi, pi = spatial_hash.query_pairs(mirrored, tolerance)
+    mirror_map[affected[qi]] = pi
+
+    mask = half_mask(coords[affected], axis_idx, direction) & (mirror_map[affected] < 0)
+    flipped = affected[mask != state['mask'][affected]]
+    state['mask'][affected] = mask
+    return flipped
+
+
+# Clear the cached data when a different file is loaded
+@bpy.app.handlers.persistent
+def clear_caches(*args):
+    mirror_map_cache.clear()
+    live_asymmetry_states.clear()
+    node_group_index.invalidate()
+
+
+# Undo and redo bring back the attribute of the live asymmetry check as it was, so start it over after them
+@bpy.app.handlers.persistent
+def clear_live_asymmetry_states(*args):
+    live_asymmetry_states.clear()
+
+
+# Snap near-miss asymmetrical vertices to exact mirror positions, without changing the topology
+# Each unmatched vertex on the positive side is paired with the nearest unmatched vertex on the other side
+# within the snap tolerance, which is then moved to its exact mirrored position. Unpaired vertices closer
+# to the symmetry plane than the snap tolerance are moved onto it
+# Returns the new coordinates and the indices of the moved vertices
+def symmetrize_coordinates(coords, axis_idx, direction, mirror_map, snaptolerance):
+    coords = coords.copy()
+    pos = coords[:, axis_idx] * direction
+    source = np.flatnonzero((pos > 0) & (mirror_map < 0))
+    target = np.flatnonzero((pos < 0) & (mirror_map < 0))
+
+    mirrored = coords[source].copy()
+    mirrored[:, axis_idx] = -mirrored[:, axis_idx]
+
+    # Only pairs within the snap tolerance are used, so look them up in a grid of that size and keep the
+    # closest candidate of each source
+    qi, pi = SpatialHash(coords[target], snaptolerance).query_pairs(mirrored, snaptolerance)
+    distances = np.linalg.norm(coords[target[pi]] - mirrored[qi], axis=1)
+    order = np.lexsort((distances, qi))
+    closest = order[np.unique(qi[order], return_index=True)[1]]
+    source, nearest, distances, mirrored = source[qi[closest]], target[pi[closest]], distances[closest], mirrored[qi[closest]]
+
+    # Each vertex on the other side can only be claimed once, the closest source wins
+    order = np.argsort(distances, kind='stable')
+    _, first = np.unique(nearest[order], return_index=True)
+    chosen = order[first]
+    coords[nearest[chosen]] = mirrored[chosen]
+    paired = np.zeros(len(coords), dtype=bool)
+    paired[source[chosen]] = True
+    paired[nearest[chosen]] = True
+
+    # Flatten the rest of the near-miss vertices onto the symmetry plane
+    center = np.flatnonzero((mirror_map < 0) & ~paired & (np.abs(pos) < snaptolerance))
+    coords[center, axis_idx] = 0.0
+
+    return coords, np.concatenate([nearest[chosen], center])
+
+
+# Read every vertex group weight of a mesh in one pass over its vertices
+# Returns the vertex index, group index and weight of each assignment, sorted by vertex
+def get_vertex_group_weights(mesh):
+    vertices = []
+    groups = []
+    weights = []
+    for v in mesh.vertices:
+        for element in v.groups:
+            vertices.append(v.index)
+            groups.append(element.group)
+            weights.append(element.weight)
+    return np.array(vertices, dtype=np.int64), np.array(groups, dtype=np.int64), np.array(weights, dtype=np.float32)
+
+
+# Mirror vertex group weights with a mirror map. Every matched vertex on the other side of the axis, or on the
+# center line, gets the weights of its counterpart in the flipped group given by group_map
+# Takes the assignments sorted by vertex. Returns the mask of the rewritten vertices and their new assignments
+def mirror_vertex_group_weights(coords, axis_idx, direction, mirror_map, vertices, groups, weights, group_map, tolerance=0.00000001):
+    pos = coords[:, axis_idx] * direction
+    targets = (pos <= tolerance) & (mirror_map >= 0)
+
+    # Gather the assignments of the counterpart of each target, the assignments of each vertex are a contiguous block
+    target = np.flatnonzero(targets)
+    source = mirror_map[target]
+    counts = np.bincount(vertices, minlength=len(coords))
+    starts = np.cumsum(counts) - counts
+    n = counts[source]
+    offsets = np.repeat(starts[source] - (np.cumsum(n) - n), n) + np.arange(n.sum())
+
+    return targets, np.repeat(target, n), group_map[groups[offsets]], weights[offsets]
+
+
+# Get the two vertex indices of every edge of a mesh as an (n, 2) array
+def get_edge_vertices(mesh):
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    return edges.reshape(-1, 2)
+
+
+# Group flagged vertices into islands connected by edges between flagged vertices
+# Returns the size, minimum and maximum corner of the bounding box of each island, largest island first
+def find_islands(coords, edges, mask):
+    flagged = np.flatnonzero(mask)
+    if len(flagged) == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, 3)), np.empty((0, 3))
+
+    inside = mask[edges[:, 0]] & mask[edges[:, 1]]
+    labels = connected_components(len(coords), edges[inside, 0], edges[inside, 1])
+    _, islands, sizes = np.unique(labels[flagged], return_inverse=True, return_counts=True)
+
+    # Sort the vertices by island so each island is a contiguous block for the bounding boxes
+    order = np.argsort(islands.reshape(-1), kind='stable')
+    points = coords[flagged[order]]
+    starts = np.cumsum(sizes) - sizes
+    mins = np.minimum.reduceat(points, starts, axis=0)
+    maxs = np.maximum.reduceat(points, starts, axis=0)
+
+    rank = np.argsort(-sizes, kind='stable')
+    return sizes[rank], mins[rank], maxs[rank]
+
+
+# Describe the largest islands for the report
+def describe_islands(sizes, mins, maxs, limit=10):
+    msgs = []
+    for i in range(min(limit, len(sizes))):
+        center = (mins[i] + maxs[i]) * 0.5
+        size = maxs[i] - mins[i]
+        msgs.append(f"Island {i + 1}: {sizes[i]} vertices, size {size[0]:.4f} x {size[1]:.4f} x {size[2]:.4f} at ({center[0]:.4f}, {center[1]:.4f}, {center[2]:.4f})")
+    if len(sizes) > limit:
+        msgs.append(f"...and {len(sizes) - limit} smaller islands")
+    return msgs
+
+
+# Point every 3D viewport at a world space bounding box
+def frame_bounds(context, minimum, maximum):
+    center = (Vector(minimum) + Vector(maximum)) * 0.5
+    radius = max((Vector(maximum) - Vector(minimum)).length * 0.5, 0.01)
+    for area in context.screen.areas:
+        if area.type == 'VIEW_3D':
+            region_3d = area.spaces.active.region_3d
+            region_3d.view_location = center
+            region_3d.view_distance = radius * 3.0
+            area.tag_redraw()
+
+
+# World space bounding box of a local space bounding box
+def world_bounds(obj, minimum, maximum):
+    corners = np.array(list(itertools.product(*zip(minimum, maximum))))
+    corners = to_world_space(obj, corners)
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+# Transform local vertex coordinates into world space
+def to_world_space(obj, coords):
+    matrix = np.array(obj.matrix_world)
+    return coords @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+# Find coincident vertices between different objects, given the world space vertices of each object and
+# the (edge count, face count) of each object
+# Returns a mask of the coincident vertices of each object, and the (a, b) index pairs of objects where every
+# vertex of a has a match in b and every vertex of b has a match in a, and both have the same element counts
+def find_cross_object_duplicates(coords_list, distance, element_counts):
+    counts = np.array([len(coords) for coords in coords_list], dtype=np.int64)
+    starts = np.cumsum(counts) - counts
+    if counts.sum() == 0:
+        return [np.zeros(0, dtype=bool) for coords in coords_list], []
+    points = np.concatenate(coords_list)
+    owner = np.repeat(np.arange(len(coords_list)), counts)
+
+    # One shared spatial hash over every object, only pairs from different objects count
+    qi, pi = SpatialHash(points, distance).query_pairs(points, distance)
+    other = owner[qi] != owner[pi]
+    qi, pi = qi[other], pi[other]
+
+    coincident = np.zeros(len(points), dtype=bool)
+    coincident[qi] = True
+    masks = [coincident[start:start + count] for start, count in zip(starts.tolist(), counts.tolist())]
+
+    # Count how many different vertices of each object have a match in each other object
+    objects = len(coords_list)
+    matched = np.unique(qi * objects + owner[pi])
+    pair_keys, pair_counts = np.unique(owner[matched // objects] * objects + matched % objects, return_counts=True)
+    a, b = pair_keys // objects, pair_keys % objects
+
+    # Matching one way isn't enough, repeated vertices in a can all match one vertex of b while b has others
+    covered = pair_keys[pair_counts == counts[a]]
+    element_counts = np.array(element_counts, dtype=np.int64).reshape(-1, 2)
+    duplicated = np.isin(pair_keys, covered) & np.isin(b * objects + a, covered) & (counts[a] == counts[b])
+    duplicated &= np.all(element_counts[a] == element_counts[b], axis=1)
+    return masks, list(zip(a[duplicated].tolist(), b[duplicated].tolist()))
+
+
+# Find duplicate and degenerate geometry from the mesh arrays, using distance as the zero length threshold
+# Returns a dictionary with a mask per category, over faces, edges or vertices
+def find_degenerate_geometry(coords, edges, loop_starts, loop_totals, loop_verts, loop_edges, areas, distance):
+    results = {}
+
+    # Faces with the same set of vertices as an earlier face, so only the extra copies are flagged. Faces are grouped
+    # by size so each group is a plain 2D array of vertex indices, sorted per row to ignore the winding and start
+    duplicate_faces = np.zeros(len(loop_starts), dtype=bool)
+    for size in np.unique(loop_totals).tolist():
+        faces = np.flatnonzero(loop_totals == size)
+        verts = np.sort(loop_verts[loop_starts[faces, None] + np.arange(size)], axis=1)
+        _, first = np.unique(verts, axis=0, return_index=True)
+        duplicate_faces[faces] = True
+        duplicate_faces[faces[first]] = False
+    results['Duplicate faces'] = duplicate_faces
+
+    # Faces without area and edges without length
+    results['Zero area faces'] = areas < distance * distance
+    results['Zero length edges'] = np.linalg.norm(coords[edges[:, 0]] - coords[edges[:, 1]], axis=1) < distance
+
+    # Edges that aren't part of a face, and vertices that aren't part of an edge
+    results['Loose edges'] = np.bincount(loop_edges, minlength=len(edges)) == 0
+    results['Loose vertices'] = np.bincount(edges.ravel(), minlength=len(coords)) == 0
+    return results
+
+
+# Masks of the flagged vertices, edges and faces
+def degenerate_element_masks(results):
+    edges = results['Zero length edges'] | results['Loose edges']
+    faces = results['Duplicate faces'] | results['Zero area faces']
+    return results['Loose vertices'], edges, faces
+
+
+# Label the connected components of a graph given as two arrays of edge endpoints
+# Vectorized union-find: hook the roots of every edge to the smaller label, then flatten the trees
+def connected_components(count, a, b):
+    labels = np.arange(count, dtype=np.int64)
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+
+    while True:
+        # Hook the root of each endpoint to the smallest root of the edge
+        la = labels[a]
+        lb = labels[b]
+        low = np.minimum(la, lb)
+        np.minimum.at(labels, la, low)
+        np.minimum.at(labels, lb, low)
+
+        # Pointer jumping until every vertex points straight at its root
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+        # Done once both endpoints of every edge share a root
+        if np.array_equal(labels[a], labels[b]):
+            return labels
+
+
+# Find clusters of points that are within the merge distance of each other
+# Returns the cluster index of each point (-1 if it has no duplicate) and the number of clusters
+def find_duplicate_clusters(coords, distance):
+    qi, pi = SpatialHash(coords, distance).query_pairs(coords, distance)
+
+    # Every point finds itself, and each pair is found from both sides
+    keep = qi < pi
+    labels = connected_components(len(coords), qi[keep], pi[keep])
+
+    # Only components with more than one point are clusters
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    duplicated = counts[inverse] > 1
+    clusters = np.full(len(coords), -1, dtype=np.int64)
+    cluster_ids, clusters[duplicated] = np.unique(labels[duplicated], return_inverse=True)
+    return clusters, len(cluster_ids)
+
+
+# --------------------------------------------------------------------------------
+# Node group helpers
+
+# Node group usage index. Keeps the data blocks that use each node group directly, so finding the users of a
+# node group is a lookup instead of a scan of every node in the file. It's built on the first query, then only
+# the data blocks reported as changed are scanned again. Adding, removing or renaming data blocks rebuilds it
+class NodeGroupIndex:
+    # Data collections that can use node groups, with the label shown for them
+    owners = {
+        'node_groups': "Node group",
+        'materials': "Material",
+        'worlds': "World",
+        'lights': "Light",
+        'scenes': "Scene",
+        'linestyles': "Line style",
+        'textures': "Texture",
+        'objects': "Object",
+    }
+
+    # Data collection of each ID type, to find where a changed data block belongs
+    id_types = {
+        'NODETREE': 'node_groups',
+        'MATERIAL': 'materials',
+        'WORLD': 'worlds',
+        'LIGHT': 'lights',
+        'SCENE': 'scenes',
+        'LINESTYLE': 'linestyles',
+        'TEXTURE': 'textures',
+        'OBJECT': 'objects',
+    }
+
+    def __init__(self):
+        self.invalidate()
+
+    # Forget everything, the index is rebuilt on the next query
+    def invalidate(self):
+        self.signature = None
+        self.children = {}
+        self.parents = {}
+        self.embedded = {}
+        self.node_signatures = {}
+        self.dirty = set()
+        self.ancestors = {}
+        self.descendants = {}
+
+    # Cheap signature of the data blocks that can use node groups, changes when any of them is added, removed or renamed
+    @classmethod
+    def get_signature(cls):
+        signature = []
+        for collection in cls.owners:
+            names = getattr(bpy.data, collection).keys()
+            signature.append((len(names), zlib.crc32("\0".join(names).encode())))
+        return tuple(signature)
+
+    # Cheap signature of the nodes of a node group, changes when a node is added or removed, or a group node
+    # gets a different node group while the node count stays the same
+    @staticmethod
+    def get_node_signature(tree):
+        names = [node.node_tree.name for node in tree.nodes if getattr(node, 'node_tree', None) is not None]
+        return (len(tree.nodes), zlib.crc32("\0".join(names).encode()))
+
+    # Scan the node groups used directly by a data block and replace its entries in the index
+    def scan(self, key, owner):
+        collection, name = key
+        children = set()
+        if owner is not None:
+            trees = []
+            if collection == 'objects':
+                # Geometry nodes modifiers
+                children.update(m.node_group.name for m in owner.modifiers if m.type == 'NODES' and m.node_group is not None)
+            elif collection == 'node_groups':
+                trees.append(owner)
+                self.node_signatures[name] = self.get_node_signature(owner)
+            else:
+                # Materials, worlds, lights and the rest keep their nodes in a node tree of their own
+                tree = getattr(owner, 'node_tree', None)
+                if tree is not None:
+                    trees.append(tree)
+                    self.embedded[tree.as_pointer()] = key
+
+                # Newer versions use a regular node group for the compositor
+                compositor = getattr(owner, 'compositing_node_group', None)
+                if compositor is not None:
+                    children.add(compositor.name)
+
+            # Group nodes, of any tree type
+            for tree in trees:
+                children.update(node.node_tree.name for node in tree.nodes if getattr(node, 'node_tree', None) is not None)
+
+        # Replace the old entries of this data block. The transitive results may depend on them
+        self.ancestors.clear()
+        self.descendants.clear()
+        for child in self.children.pop(key, ()):
+            self.parents[child].discard(key)
+        if children:
+            self.children[key] = children
+        for child in children:
+            self.parents.setdefault(child, set()).add(key)
+
+    # Build the whole index
+    def rebuild(self, signature):
+        self.invalidate()
+        self.signature = signature
+        for collection in self.owners:
+            for owner in getattr(bpy.data, collection):
+                self.scan((collection, owner.name), owner)
+
+    # Bring the index up to date, scanning only what changed since the last query
+    def refresh(self):
+        signature = self.get_signature()
+        if signature != self.signature:
+            self.rebuild(signature)
+            return
+
+        # Node groups that aren't used in any scene aren't in the depsgraph, so also catch edits by their nodes
+        for nodegroup in bpy.data.node_groups:
+            if self.node_signatures.get(nodegroup.name) != self.get_node_signature(nodegroup):
+                self.dirty.add(('node_groups', nodegroup.name))
+
+        for collection, name in self.dirty:
+            self.scan((collection, name), getattr(bpy.data, collection).get(name))
+        self.dirty.clear()
+
+    # Mark a changed data block to be scanned again on the next query
+    def tag(self, id):
+        if self.signature is None:
+            return
+
+        if id.id_type == 'NODETREE' and id.is_embedded_data:
+            # The node tree of a material or similar, which belongs to its owner
+            key = self.embedded.get(id.as_pointer())
+            if key is None:
+                self.signature = None
+            else:
+                self.dirty.add(key)
+        elif id.id_type in self.id_types:
+            self.dirty.add((self.id_types[id.id_type], id.name))
+
+    # Data blocks that use a node group directly, as (collection, name) pairs
+    def get_parents(self, name):
+        self.refresh()
+        return self.parents.get(name, set())
+
+    # Data blocks that use a node group directly, or the node groups it uses directly, without refreshing
+    def parents_of(self, name):
+        return self.parents.get(name, ())
+
+    def children_of(self, name):
+        return [('node_groups', child) for child in self.children.get(('node_groups', name), ())]
+
+    # Everything reachable from a node group through one of the above. Memoized per node group, each search reuses
+    # the results of the node groups it reaches. Visited node groups aren't followed again, so recursion can't hang it
+    def closure(self, name, neighbours, memo):
+        if name in memo:
+            return memo[name]
+
+        found = set()
+        visited = {name}
+        stack = [name]
+        while stack:
+            for key in neighbours(stack.pop()):
+                found.add(key)
+                if key[0] == 'node_groups' and key[1] not in visited:
+                    visited.add(key[1])
+                    if key[1] in memo:
+                        found |= memo[key[1]]
+                    else:
+                        stack.append(key[1])
+
+        memo[name] = found
+        return found
+
+    # Data blocks that use a node group directly or through other node groups
+    def get_ancestors(self, name):
+        self.refresh()
+        return self.closure(name, self.parents_of, self.ancestors)
+
+    # Node groups used by a node group directly or nested in other node groups
+    def get_descendants(self, name):
+        self.refresh()
+        return self.closure(name, self.children_of, self.descendants)
+
+    # Sort (collection, name) pairs in the order of the owner collections, then by name
+    @classmethod
+    def sort_keys(cls, keys):
+        order = list(cls.owners)
+        return sorted(keys, key=lambda key: (order.index(key[0]), key[1]))
+
+    # Rows of a tree view of the users of a node group, or of the node groups it uses, depth first
+    # Each node group is only expanded the first time it shows up, later rows of it are flagged as repeated
+    # Returns (depth, collection, name, repeated) tuples, starting at depth 0
+    def get_tree(self, name, descendants=False):
+        self.refresh()
+        neighbours = self.children_of if descendants else self.parents_of
+
+        rows = []
+        expanded = {name}
+        stack = [(0, key) for key in reversed(self.sort_keys(neighbours(name)))]
+        while stack:
+            depth, key = stack.pop()
+            repeated = key[0] == 'node_groups' and key[1] in expanded
+            rows.append((depth, key[0], key[1], repeated))
+            if key[0] == 'node_groups' and not repeated:
+                expanded.add(key[1])
+                stack.extend((depth + 1, child) for child in reversed(self.sort_keys(neighbours(key[1]))))
+        return rows
+
+
+node_group_index = NodeGroupIndex()
+
+
+# Tag the data blocks that changed, so the node group index only scans those again
+@bpy.app.handlers.persistent
+def update_node_group_index(scene, depsgraph):
+    for update in depsgraph.updates:
+        node_group_index.tag(update.id.original)
+
+
+# Undo and redo swap the data without reporting what changed, so the node group index is rebuilt after them
+@bpy.app.handlers.persistent
+def invalidate_node_group_index(*args):
+    node_group_index.invalidate()
+
+
+# Complexity of node trees: node and link count, how deep node groups are nested inside, and the node count with
+# every nested node group expanded, once per group node using it. Each node group is profiled once and reused
+# by every tree that nests it. Recursive node groups count as empty where they repeat
+class NodeTreeProfiler:
+    def __init__(self):
+        self.profiles = {}
+
+    # Returns (nodes, links, depth, expanded nodes) of a node tree
+    def profile(self, tree):
+        key = tree.as_pointer()
+        if key in self.profiles:
+            return self.profiles[key]
+        self.profiles[key] = (0, 0, 0, 0)
+
+        nodes = len(tree.nodes)
+        depth = 0
+        expanded = nodes
+        for node in tree.nodes:
+            nodegroup = getattr(node, 'node_tree', None)
+            if nodegroup is not None:
+                nested = self.profile(nodegroup)
+                depth = max(depth, nested[2] + 1)
+                expanded += nested[3]
+
+        result = (nodes, len(tree.links), depth, expanded)
+        self.profiles[key] = result
+        return result
+
+# Node properties compared by each select similar mode, the first one a node has is used
+similar_node_properties = {
+    'Operation': ('operation', 'mode'),
+    'DataType': ('data_type',),
+    'BlendMode': ('blend_type',),
+}
+
+
+# Signature of a node for selecting similar nodes. Nodes are similar when their signatures are equal
+# Type compares the node type, and the node group of group nodes. The other modes also compare a setting,
+# or the values of the inputs that aren't linked
+def get_node_signature(node, similarby, hasher):
+    nodegroup = getattr(node, 'node_tree', None)
+    signature = (node.bl_idname, nodegroup.name_full if nodegroup is not None else None)
+    if similarby == 'Inputs':
+        return signature + tuple((socket.identifier, hasher.value(getattr(socket, 'default_value', None))) for socket in node.inputs if not socket.is_linked)
+    for identifier in similar_node_properties.get(similarby, ()):
+        if hasattr(node, identifier):
+            return signature + (getattr(node, identifier),)
+    return signature
+
+# Data blocks of the given collections that nothing in use can reach, as a dictionary of lists by collection
+# Builds the graph of what uses what in the whole file once, marks everything reachable from the scenes, the window
+# manager, screens and workspaces, data with a fake user and assets, and returns the local data that wasn't marked.
+# Chains of unused data are found in one go. Render results, viewer images and images with unsaved changes are
+# never returned, they would be lost for good
+def find_unreachable_data(collections):
+    user_map = bpy.data.user_map()
+
+    # Invert it into what each data block uses
+    uses = {}
+    for used, users in user_map.items():
+        for user in users:
+            uses.setdefault(user, []).append(used)
+
+    # Mark. The window manager, screens and workspaces hold what the editors show, like the image in an image editor
+    root_types = {'SCENE', 'WINDOWMANAGER', 'SCREEN', 'WORKSPACE'}
+    roots = [id for id in user_map if id.id_type in root_types or id.use_fake_user or id.asset_data is not None]
+    reachable = set(roots)
+    stack = list(roots)
+    while stack:
+        for used in uses.get(stack.pop(), ()):
+            if used not in reachable:
+                reachable.add(used)
+                stack.append(used)
+
+    # Sweep, linked data belongs to its library
+    def is_unreachable(id):
+        if id in reachable or id.library is not None:
+            return False
+        if id.id_type == 'IMAGE' and (id.type in ('RENDER_RESULT', 'COMPOSITING') or id.is_dirty):
+            return False
+        return True
+
+    return {collection: [id for id in getattr(bpy.data, collection) if is_unreachable(id)] for collection in collections}
+
+# Get the name of a data block without its .### suffix
+def get_base_name(name):
+    if len(name) > 4 and name[-4] == '.' and name[-3:].isdigit():
+        return name[:-4]
+    return name
+
+
+# Get the number of the .### suffix of a data block name, 0 if it has none
+def get_name_suffix(name):
+    if len(name) > 4 and name[-4] == '.' and name[-3:].isdigit():
+        return int(name[-3:])
+    return 0
+
+
+# Structural digest of node trees, equal for node trees that do the same thing regardless of their name, the names
+# of their nodes and the layout. Covers the node types, their properties and input values, the links, the interface
+# and the content of nested node groups. Each node tree is digested once, nested groups reuse the stored digest
+# Digests are exact: every structure is stored with its digest, so node trees only share a digest when their
+# structures are equal, and a digest collision between different structures is caught and resolved
+class NodeTreeHasher:
+    # RNA property types that are hashed by value
+    value_types = {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}
+
+    def __init__(self):
+        self.trees = {}
+        self.digests = {}
+        self.structures = {}
+
+        # Properties every data block or node has, which don't change what it does. Muting does
+        self.tree_skip = {prop.identifier for prop in bpy.types.ID.bl_rna.properties} | {'view_center'}
+        self.node_skip = {prop.identifier for prop in bpy.types.Node.bl_rna.properties} - {'mute'}
+        self.interface_skip = {'rna_type', 'identifier', 'index', 'position', 'select', 'parent'}
+
+    # Digest of a structure of plain values, the same in every session
+    def digest(self, structure):
+        digest = self.digests.get(structure)
+        if digest is None:
+            digest = hashlib.sha1(repr(structure).encode()).hexdigest()
+            while digest in self.structures:
+                digest = hashlib.sha1(digest.encode()).hexdigest()
+            self.digests[structure] = digest
+            self.structures[digest] = structure
+        return digest
+
+    # Turn an RNA value into something hashable. Nested node groups are replaced by their digest
+    def value(self, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, bpy.types.NodeTree) and not value.is_embedded_data:
+            return ('NodeTree', self.tree_digest(value))
+        if isinstance(value, bpy.types.ID):
+            return (value.id_type, value.name_full)
+        if isinstance(value, (set, frozenset)):
+            return tuple(sorted(value))
+        return tuple(self.value(item) for item in value)
+
+    # The values of the properties of a struct, skipping the given ones
+    # Nested structs like color ramps and curves are followed up to the given depth. Pointers to other nodes and
+    # sockets, like the paired node of a zone, aren't followed, those are part of the node tree already
+    def properties(self, struct, skip, depth=0):
+        values = []
+        for prop in struct.bl_rna.properties:
+            if prop.identifier in skip or prop.identifier == 'rna_type':
+                continue
+            if prop.type in self.value_types:
+                values.append((prop.identifier, self.value(getattr(struct, prop.identifier, None))))
+            elif prop.type == 'POINTER':
+                pointer = getattr(struct, prop.identifier, None)
+                if isinstance(pointer, bpy.types.ID):
+                    values.append((prop.identifier, self.value(pointer)))
+                elif pointer is not None and depth > 0 and not isinstance(pointer, (bpy.types.Node, bpy.types.NodeSocket)):
+                    values.append((prop.identifier, self.properties(pointer, (), depth - 1)))
+            elif prop.type == 'COLLECTION' and depth > 0:
+                values.append((prop.identifier, tuple(self.properties(item, (), depth - 1) for item in getattr(struct, prop.identifier))))
+        return tuple(values)
+
+    # Digest of a node tree
+    def tree_digest(self, tree):
+        key = tree.name_full
+        if key in self.trees:
+            return self.trees[key]
+
+        # Recursive node groups refer to their name instead of looping forever
+        self.trees[key] = ('Recursive', key)
+
+        # Each node by its own content, frames only affect the layout
+        nodes = [node for node in tree.nodes if node.bl_idname != 'NodeFrame']
+        node_digests = {}
+        for node in nodes:
+            inputs = tuple((socket.identifier, self.value(getattr(socket, 'default_value', None))) for socket in node.inputs)
+            node_digests[node.name] = self.digest((node.bl_idname, self.properties(node, self.node_skip, 3), inputs))
+
+        # Then by what is linked into it, so the links don't depend on the node names
+        incoming = {node.name: [] for node in nodes}
+        for link in tree.links:
+            if link.to_node.name in incoming and link.from_node.name in node_digests:
+                incoming[link.to_node.name].append((link.to_socket.identifier, node_digests[link.from_node.name], link.from_socket.identifier, link.is_muted))
+        node_digests = {name: self.digest((node_digests[name], tuple(sorted(links)))) for name, links in incoming.items()}
+        links = sorted((node_digests[link.from_node.name], link.from_socket.identifier, node_digests[link.to_node.name], link.to_socket.identifier, link.is_muted) for link in tree.links if link.from_node.name in node_digests and link.to_node.name in node_digests)
+
+        interface = tuple(self.properties(item, self.interface_skip) for item in tree.interface.items_tree)
+        result = self.digest((tree.bl_idname, self.properties(tree, self.tree_skip), interface, tuple(sorted(node_digests.values())), tuple(links)))
+        self.trees[key] = result
+        return result
+
+
+# Search index over the node group names for the search as you type picker
+# Names starting with the typed text are found by bisecting the sorted names, names containing it through the
+# sets of names of each of its trigrams. If too little matches, names sharing most trigrams with it are suggested,
+# which catches typos. The index is rebuilt when node groups are added, removed or renamed
+class NodeGroupSearchIndex:
+    def __init__(self):
+        self.signature = None
+
+    # Split a name into its lowercase trigrams
+    @staticmethod
+    def get_trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    # Build the index
+    def rebuild(self, signature):
+        self.signature = signature
+        entries = sorted((nodegroup.name.lower(), nodegroup.name, nodegroup.type) for nodegroup in bpy.data.node_groups)
+        self.keys = [entry[0] for entry in entries]
+        self.names = [entry[1] for entry in entries]
+        self.types = [entry[2] for entry in entries]
+        self.trigrams = {}
+        for i, key in enumerate(self.keys):
+            for trigram in self.get_trigrams(key):
+                self.trigrams.setdefault(trigram, set()).add(i)
+
+    # Search the node group names, optionally of one tree type. Exact matches come first, then the names
+    # starting with the text, then the names containing it, then the closest ones. Returns (name, type) pairs
+    def search(self, text, tree_type="ALL", limit=100):
+        # Renaming doesn't always reach the depsgraph, so compare the names themselves, which is a single list
+        signature = bpy.data.node_groups.keys()
+        if signature != self.signature:
+            self.rebuild(signature)
+
+        text = text.lower()
+        if not text:
+            found = list(range(len(self.keys)))
+        else:
+            # Names starting with the text are a contiguous block of the sorted names
+            start = bisect.bisect_left(self.keys, text)
+            end = bisect.bisect_left(self.keys, text + "\uffff", start)
+            prefixed = list(range(start, end))
+
+            # Names containing the text, from the names that have all its trigrams
+            trigrams = self.get_trigrams(text)
+            if trigrams:
+                sets = sorted((self.trigrams.get(trigram, set()) for trigram in trigrams), key=len)
+                candidates = set.intersection(*sets)
+            else:
+                candidates = range(len(self.keys))
+            prefixed_set = set(prefixed)
+            contained = sorted((i for i in candidates if i not in prefixed_set and text in self.keys[i]), key=lambda i: (self.keys[i].index(text), len(self.keys[i])))
+            found = sorted(prefixed, key=lambda i: (self.keys[i] != text, len(self.keys[i]))) + contained
+
+            # Not much found, suggest the names sharing the most trigrams, which catches typos
+            if len(found) < limit and len(trigrams) > 1:
+                shared = {}
+                for trigram in trigrams:
+                    for i in self.trigrams.get(trigram, ()):
+                        shared[i] = shared.get(i, 0) + 1
+                found_set = set(found)
+                close = [i for i, count in shared.items() if i not in found_set and count * 3 >= len(trigrams)]
+                found += sorted(close, key=lambda i: (-shared[i], len(self.keys[i])))
+
+        if tree_type != "ALL":
+            found = [i for i in found if self.types[i] == tree_type]
+        return [(self.names[i], self.types[i].title()) for i in found[:limit]]
+
+
+node_group_search_index = NodeGroupSearchIndex()
+
+# Cached items of the dynamic enum dropdowns, by dropdown. Blender calls the item functions on every redraw, and
+# the strings they return have to stay referenced from Python while they are shown, which the cache also takes care of
+enum_items_cache = {}
+
+
+# Get the cached items of a dropdown, only building them again when the signature changed
+def get_cached_enum_items(key, signature, build):
+    cached = enum_items_cache.get(key)
+    if cached is None or cached[0] != signature:
+        cached = (signature, build())
+        enum_items_cache[key] = cached
+    return cached[1]